@@ -1,166 +1,287 @@
 """
 Веб-приложение для обработки zip-архивов с анкетами редакционной коллегии.
 """
+import io
+import json
+import os
+import threading
 import zipfile
 import tempfile
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
 from pathlib import Path
-from typing import Tuple
-from flask import Flask, request, render_template, jsonify
-from werkzeug.utils import secure_filename
-from editor_parser import parse_profiles_from_docx
-import html as html_escape
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+from flask import Flask, Request, Response, request, render_template, jsonify, send_file, stream_template
+from artifacts import ARTIFACTS, CACHE_CONTROL, ArtifactStore, etag_matches
+from dedupe import dedupe_profiles
+from editor_parser import DocxSource, preload_backend
+from export import EXPORT_FORMATS, export_profiles, iter_jsonl, write_jsonl
+from identifiers import normalize_profiles
+from jobs import JobManager
+from metrics import METRICS
+from models import Profile
+from parse_cache import ParseCache
+from renderer import english_lines, make_english_html, make_profile_html, render_profiles
+from uploads import api_result, collect_parts, docx_members, iter_member_blobs
+import warmup
+
+
+
+class SpooledRequest(Request):
+    """
+    Запрос, в котором каждый загруженный файл читается в собственный
+    SpooledTemporaryFile: небольшие архивы остаются в памяти, крупные
+    уходят в анонимный временный файл, который удаляется при закрытии.
+    Одновременные загрузки с одинаковым именем файла не пересекаются.
+    """
+    
+    def _get_file_stream(self, total_content_length, content_type, filename=None, content_length=None):
+        return tempfile.SpooledTemporaryFile(max_size=app.config['UPLOAD_SPOOL_MAX_SIZE'], mode='rb+')
+
 
 app = Flask(__name__, template_folder='templates')
+app.request_class = SpooledRequest
 app.config['MAX_CONTENT_LENGTH'] = 50 * 1024 * 1024  # 50MB максимум
-app.config['UPLOAD_FOLDER'] = tempfile.gettempdir()
+# Порог, после которого загруженный архив буферизуется на диск, а не в памяти
+app.config['UPLOAD_SPOOL_MAX_SIZE'] = int(os.environ.get('UPLOAD_SPOOL_MAX_SIZE', 16 * 1024 * 1024))  # 16MB
+# Порог, после которого английский HTML при потоковой выдаче буферизуется на диск
+app.config['STREAM_SPOOL_MAX_SIZE'] = 1024 * 1024  # 1MB
+# Количество процессов для парсинга архива. По умолчанию 1 - разбор в процессе
+# воркера: параллельность дают сами воркеры gunicorn, а fork пула для небольшого
+# архива дороже разбора. При PARSE_WORKERS > 1 у воркера один общий пул процессов
+app.config['PARSE_WORKERS'] = int(os.environ.get('PARSE_WORKERS', 1))
+# Процессы разбора для пакетного /api/parse: по умолчанию по числу ядер, пул
+# создается при первом запросе к /api/parse (API_PARSE_WORKERS=1 - без пула)
+app.config['API_PARSE_WORKERS'] = int(os.environ.get('API_PARSE_WORKERS') or os.cpu_count() or 1)
+# Способ чтения таблиц: "docx" (python-docx) или "lxml" (быстрый разбор XML)
+app.config['PARSER_BACKEND'] = os.environ.get('PARSER_BACKEND')
+# Кэш разобранных docx: число файлов в памяти и общий для воркеров каталог на диске
+# (без PARSE_CACHE_DIR у каждого воркера свой кэш, см. parse_cache.py)
+app.config['PARSE_CACHE_SIZE'] = int(os.environ.get('PARSE_CACHE_SIZE', 1024))
+app.config['PARSE_CACHE_DIR'] = os.environ.get('PARSE_CACHE_DIR')
+# Сколько секунд хранить файл кэша на диске после последнего обращения
+app.config['PARSE_CACHE_TTL'] = int(os.environ.get('PARSE_CACHE_TTL', 7 * 86400))
 
+# Фоновые задачи (/upload?mode=job): число одновременно обрабатываемых архивов
+# и время хранения результата в секундах
+app.config['JOBS_DIR'] = os.environ.get('JOBS_DIR', str(Path(tempfile.gettempdir()) / 'editor_board_jobs'))
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))
+app.config['JOB_TTL'] = int(os.environ.get('JOB_TTL', 3600))
 
-def field(label: str, value: str) -> bool:
-    """Проверяет, есть ли значение в поле."""
-    return bool(value and value.strip() and value.strip() != "-")
+# Готовые результаты /upload по содержимому архива (см. artifacts.py) и время
+# их хранения после последнего обращения в секундах
+app.config['ARTIFACTS_DIR'] = os.environ.get(
+    'ARTIFACTS_DIR', str(Path(tempfile.gettempdir()) / 'editor_board_artifacts')
+)
+app.config['ARTIFACTS_TTL'] = int(os.environ.get('ARTIFACTS_TTL', 86400))
 
+# Объединять повторяющиеся профили по умолчанию (в запросе - параметр dedupe)
+app.config['DEDUPE_PROFILES'] = os.environ.get('DEDUPE_PROFILES', 'false').lower() == 'true'
 
-def make_profile_html(profile: dict) -> str:
-    """Создает HTML блок для профиля."""
-    html_block = []
+# Нормализовать и проверять ORCID, Scopus ID, Researcher ID, SPIN, email и сайт
+# по умолчанию (в запросе - параметр normalize_ids, см. identifiers.py)
+app.config['NORMALIZE_IDENTIFIERS'] = os.environ.get('NORMALIZE_IDENTIFIERS', 'false').lower() == 'true'
 
-    # ФИО жирным, остальное обычным
-    full_line = profile["ФИО, звание и место работы"]
-    parts = full_line.split(",", 1)
-    if len(parts) == 2:
-        fio = html_escape.escape(parts[0].strip())
-        rest = html_escape.escape(parts[1].strip())
-        html_block.append(f'<p style="padding-left: 40px;"><strong>{fio}</strong>, {rest}</p>')
-    else:
-        html_block.append(f'<p style="padding-left: 40px;"><strong>{html_escape.escape(full_line)}</strong></p>')
+# Сбор метрик по этапам обработки для /metrics (METRICS_ENABLED=false - выключить)
+app.config['METRICS_ENABLED'] = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS.enabled = app.config['METRICS_ENABLED']
 
-    if field("Специализация", profile["Специализация"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>Специализация:&nbsp;</strong>'
-            f'{html_escape.escape(profile["Специализация"])}</p>'
-        )
+# Веб-приложение импортирует все сразу: первый запрос не должен ждать импорта
+preload_backend(app.config['PARSER_BACKEND'])
 
-    if field("Сайт", profile["Сайт"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>Адрес личной страницы в интернете URL: </strong>'
-            f'<a href="{html_escape.escape(profile["Сайт"])}" target="_blank" rel="noopener">'
-            f'{html_escape.escape(profile["Сайт"])}</a></p>'
-        )
+parse_cache = ParseCache(
+    max_entries=app.config['PARSE_CACHE_SIZE'],
+    directory=app.config['PARSE_CACHE_DIR'],
+    ttl=app.config['PARSE_CACHE_TTL'],
+)
 
-    if field("Email", profile["Email"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>E-mail:</strong> '
-            f'<a href="mailto:{html_escape.escape(profile["Email"])}" target="_blank" rel="noopener">'
-            f'{html_escape.escape(profile["Email"])}</a></p>'
-        )
+job_manager = JobManager(
+    app.config['JOBS_DIR'],
+    max_workers=app.config['JOB_WORKERS'],
+    ttl=app.config['JOB_TTL'],
+)
 
-    if field("SPIN", profile["SPIN"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>eLibrary SPIN-код: </strong>'
-            f'{html_escape.escape(profile["SPIN"])}</p>'
-        )
+artifact_store = ArtifactStore(app.config['ARTIFACTS_DIR'], ttl=app.config['ARTIFACTS_TTL'])
 
-    if field("Scopus ID", profile["Scopus ID"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>SCOPUS Author ID: </strong>'
-            f'<a href="https://www.scopus.com/authid/detail.uri?authorId={html_escape.escape(profile["Scopus ID"])}" '
-            f'target="_blank" rel="noopener">{html_escape.escape(profile["Scopus ID"])}</a></p>'
-        )
 
-    if field("Researcher ID", profile["Researcher ID"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>Researcher ID: </strong>'
-            f'<a href="https://publons.com/researcher/{html_escape.escape(profile["Researcher ID"])}" '
-            f'target="_blank" rel="noopener">{html_escape.escape(profile["Researcher ID"])}</a></p>'
-        )
+_parse_pools: Dict[int, Tuple[int, ProcessPoolExecutor]] = {}
+_parse_pool_lock = threading.Lock()
 
-    if field("ORCID", profile["ORCID"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>ORCID: </strong>'
-            f'<a href="https://orcid.org/{html_escape.escape(profile["ORCID"])}" '
-            f'target="_blank" rel="noopener">{html_escape.escape(profile["ORCID"])}</a></p>'
-        )
 
-    return "\n".join(html_block)
+def parse_executor(workers: int, broken: Optional[Executor] = None) -> ProcessPoolExecutor:
+    """
+    Общий пул из workers процессов разбора для всех запросов этого процесса
+    (см. editor_parser.ExecutorFactory): один на PARSE_WORKERS и один на
+    API_PARSE_WORKERS, если они различаются. Пул создается при первом
+    разборе, то есть в воркере gunicorn, а не в главном процессе.
+    
+    Args:
+        broken: Пул, в котором аварийно завершился процесс (OOM, падение
+                lxml): он заменяется новым, если его еще не заменил другой запрос
+    """
+    with _parse_pool_lock:
+        pid, executor = _parse_pools.get(workers, (None, None))
+        # Пул, унаследованный через fork, принадлежит другому процессу
+        if executor is None or pid != os.getpid() or executor is broken:
+            if executor is not None and pid == os.getpid():
+                print("Процесс разбора завершился аварийно, пул процессов пересоздается")
+                METRICS.count("pool_restarts")
+                executor.shutdown(wait=False, cancel_futures=True)
+            preload_backend(app.config['PARSER_BACKEND'])
+            executor = ProcessPoolExecutor(max_workers=workers)
+            _parse_pools[workers] = (os.getpid(), executor)
+        return executor
 
 
-def process_zip_archive(zip_path: Path) -> Tuple[str, str]:
+def iter_parsed(sources: Iterable[DocxSource],
+                workers: Optional[int] = None) -> Iterator[Tuple[List[Profile], Optional[str]]]:
+    """
+    Разбор с кэшем в общем пуле процессов (см. parse_executor), в порядке sources.
+    
+    Args:
+        workers: Число процессов разбора (по умолчанию PARSE_WORKERS)
+    """
+    workers = workers or app.config['PARSE_WORKERS']
+    results = parse_cache.iter_parse_many(
+        sources, workers=workers, backend=app.config['PARSER_BACKEND'],
+        executor=partial(parse_executor, workers),
+    )
+    return METRICS.timed(results, "parse")
+
+
+def iter_archive_profiles(zip_ref: zipfile.ZipFile, members: List[zipfile.ZipInfo],
+                          progress: Optional[Callable[[int, int], None]] = None) -> Iterator[Profile]:
+    """
+    Отдает профили из всех файлов по мере разбора: неизмененные файлы
+    берутся из кэша, остальные разбираются (см. iter_parsed). Архив
+    должен оставаться открытым, пока итератор не исчерпан.
+    
+    Args:
+        progress: Вызывается как progress(готово, всего) после каждого файла
+    """
+    METRICS.count("jobs")
+    results = iter_parsed(iter_member_blobs(zip_ref, members))
+    for done, (info, (profiles, error)) in enumerate(zip(members, results), 1):
+        if progress:
+            progress(done, len(members))
+        if error:
+            # Пропускаем файлы с ошибками, но логируем
+            print(f"Ошибка при обработке {Path(info.filename).name}: {error}")
+            continue
+        # Из файла может быть получено несколько профилей
+        yield from profiles
+
+
+def postprocess_profiles(profiles: List[Profile], dedupe: bool = False,
+                         normalize_ids: bool = False) -> List[Profile]:
+    """Пакетные этапы после разбора: нормализация идентификаторов, затем объединение дубликатов."""
+    if normalize_ids:
+        with METRICS.stage("identifiers"):
+            profiles = normalize_profiles(profiles)
+    return dedupe_profiles(profiles) if dedupe else profiles
+
+
+def parse_zip_archive(zip_path: Union[Path, BinaryIO],
+                      progress: Optional[Callable[[int, int], None]] = None,
+                      dedupe: bool = False, normalize_ids: bool = False) -> List[Profile]:
+    """Профили из всех docx файлов архива в порядке файлов (см. postprocess_profiles)."""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        profiles = list(iter_archive_profiles(zip_ref, docx_members(zip_ref), progress=progress))
+    return postprocess_profiles(profiles, dedupe=dedupe, normalize_ids=normalize_ids)
+
+
+def process_zip_archive(zip_path: Union[Path, BinaryIO],
+                        progress: Optional[Callable[[int, int], None]] = None,
+                        dedupe: bool = False, normalize_ids: bool = False) -> Tuple[str, str]:
     """
     Обрабатывает zip-архив с docx файлами.
     
+    Args:
+        zip_path: Путь к архиву или файловый объект с ним
+        progress: Вызывается как progress(готово, всего) по мере разбора файлов
+        dedupe: Объединять повторяющиеся профили (см. dedupe.py)
+        normalize_ids: Нормализовать идентификаторы (см. identifiers.py)
+    
     Returns:
         Tuple[str, str]: (html_ru, html_en)
     """
-    profiles_html = []
-    english_html = []
+    # Собираем все профили из всех файлов
+    all_profiles = parse_zip_archive(zip_path, progress=progress, dedupe=dedupe, normalize_ids=normalize_ids)
     
-    # Создаем временную директорию для распаковки
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_path = Path(temp_dir)
-        
-        # Распаковываем архив
-        with zipfile.ZipFile(zip_path, 'r') as zip_ref:
-            zip_ref.extractall(temp_path)
-        
-        # Ищем все docx файлы (включая вложенные папки)
-        docx_files = list(temp_path.rglob("*.docx"))
-        
-        if not docx_files:
-            raise ValueError("В архиве не найдено файлов .docx")
-        
-        # Собираем все профили из всех файлов
-        all_profiles = []
-        for docx_file in docx_files:
-            try:
-                # Получаем все профили из файла (может быть несколько)
-                profiles = parse_profiles_from_docx(docx_file)
-                all_profiles.extend(profiles)
-            except Exception as e:
-                # Пропускаем файлы с ошибками, но логируем
-                print(f"Ошибка при обработке {docx_file.name}: {e}")
-                continue
-        
-        # Обрабатываем каждый профиль с разделителями
-        for idx, profile in enumerate(all_profiles):
-            # Русский HTML
-            profiles_html.append(make_profile_html(profile["ru"]))
-            
-            # Добавляем перенос строки между профилями (кроме последнего)
-            if idx < len(all_profiles) - 1:
-                profiles_html.append('<br>')
-            
-            # Английский HTML
-            if profile["en"]["Name, position, affiliation"]:
-                # HTML блок на английском
-                line = profile["en"]["Name, position, affiliation"]
-                parts = line.split(",", 1)
-                if len(parts) == 2:
-                    fio = html_escape.escape(parts[0].strip())
-                    rest = html_escape.escape(parts[1].strip())
-                    english_html.append(
-                        f'<p style="padding-left: 40px;"><strong>{fio}</strong>, {rest}</p>'
-                    )
-                else:
-                    english_html.append(
-                        f'<p style="padding-left: 40px;"><strong>{html_escape.escape(line)}</strong></p>'
-                    )
-                
-                if profile["en"].get("Keywords"):
-                    english_html.append(
-                        f'<p style="padding-left: 80px;"><strong>Keywords:&nbsp;</strong>'
-                        f'{html_escape.escape(profile["en"]["Keywords"])}</p>'
-                    )
-            
-            # Добавляем перенос строки между профилями в английской версии (кроме последнего)
-            if idx < len(all_profiles) - 1:
-                english_html.append('<br>')
-    
-    html_ru = ''.join(profiles_html).strip()
-    html_en = ''.join(english_html).strip()
+    # Профили разделяются переносом строки
+    with METRICS.stage("render"):
+        html_ru, html_en = render_profiles(all_profiles)
     
     return html_ru, html_en
 
 
+def stream_archive_html(zip_ref: zipfile.ZipFile) -> Tuple[Iterator[str], Iterator[str]]:
+    """
+    Потоковый вариант process_zip_archive.
+    
+    Русский HTML каждого профиля отдается сразу после разбора его файла.
+    Файлы архива читаются по мере разбора (не больше PARSE_WINDOW на
+    процесс пула), английский HTML накапливается в SpooledTemporaryFile и
+    отдается после русского, поэтому память не растет ни с числом файлов,
+    ни с числом профилей. Архив закрывается,
+    когда русская часть отдана целиком. Дубликаты здесь не объединяются
+    и идентификаторы не нормализуются: эти этапы работают со всеми
+    профилями сразу.
+    
+    Raises:
+        ValueError: если в архиве нет ни одного docx файла
+    
+    Returns:
+        Tuple[Iterator[str], Iterator[str]]: (фрагменты html_ru, фрагменты html_en)
+    """
+    members = docx_members(zip_ref)
+    english_buffer = tempfile.SpooledTemporaryFile(
+        max_size=app.config['STREAM_SPOOL_MAX_SIZE'], mode='w+', encoding='utf-8'
+    )
+    
+    def russian_chunks() -> Iterator[str]:
+        try:
+            for idx, profile in enumerate(iter_archive_profiles(zip_ref, members)):
+                # Перенос строки между профилями: перед каждым, кроме первого
+                separator = '<br>' if idx else ''
+                with METRICS.stage("render"):
+                    html_ru = make_profile_html(profile.ru)
+                    english_buffer.write(separator + make_english_html(profile.en))
+                yield separator + html_ru
+        finally:
+            zip_ref.close()
+    
+    def english_chunks() -> Iterator[str]:
+        with english_buffer:
+            english_buffer.seek(0)
+            while True:
+                chunk = english_buffer.read(64 * 1024)
+                if not chunk:
+                    break
+                yield chunk
+    
+    return russian_chunks(), english_chunks()
+
+
+def option_requested(name: str, default: bool) -> bool:
+    """Значение флага из параметра name запроса, иначе default."""
+    value = request.values.get(name)
+    if value is None:
+        return default
+    return value.lower() in ('1', 'true', 'yes', 'on')
+
+
+def dedupe_requested() -> bool:
+    """Объединять ли дубликаты: параметр dedupe запроса, иначе DEDUPE_PROFILES."""
+    return option_requested('dedupe', app.config['DEDUPE_PROFILES'])
+
+
+def normalize_requested() -> bool:
+    """Нормализовать ли идентификаторы: параметр normalize_ids, иначе NORMALIZE_IDENTIFIERS."""
+    return option_requested('normalize_ids', app.config['NORMALIZE_IDENTIFIERS'])
+
+
 @app.route('/')
 def index():
     """Главная страница с формой загрузки."""
@@ -181,36 +302,285 @@ def upload_file():
     if not file.filename.lower().endswith('.zip'):
         return jsonify({'error': 'Файл должен быть в формате .zip'}), 400
     
-    # Сохраняем файл во временную директорию
-    filename = secure_filename(file.filename)
-    temp_file_path = Path(app.config['UPLOAD_FOLDER']) / filename
+    if request.values.get('mode') == 'job':
+        return submit_job(file)
+    
+    if request.values.get('mode') == 'stream':
+        return stream_upload(file)
+    
+    if request.values.get('format'):
+        return export_upload(file, request.values['format'])
     
     try:
-        file.save(str(temp_file_path))
-        
-        # Обрабатываем архив
-        html_ru, html_en = process_zip_archive(temp_file_path)
-        
-        # Удаляем временный файл
-        temp_file_path.unlink()
-        
-        # Возвращаем результаты
-        return render_template(
-            'result.html',
-            html_ru=html_ru,
-            html_en=html_en
-        )
+        return render_template('result.html', artifacts=build_artifacts(file))
+    except zipfile.BadZipFile:
+        return jsonify({'error': 'Некорректный zip-архив'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': f'Ошибка обработки: {str(e)}'}), 500
+
+
+def build_artifacts(file) -> Dict[str, str]:
+    """
+    Результаты архива по его содержимому (см. artifacts.py): повторно
+    загруженный архив не разбирается. Архив уже в буфере запроса
+    (см. SpooledRequest), читается оттуда без копирования.
     
+    Returns:
+        Адреса результатов: имя -> URL
+    """
+    dedupe, normalize_ids = dedupe_requested(), normalize_requested()
+    key = ArtifactStore.key(file.stream, dedupe=dedupe, normalize_ids=normalize_ids)
+    if artifact_store.has(key):
+        METRICS.count("artifacts_reused")
+    else:
+        all_profiles = parse_zip_archive(file.stream, dedupe=dedupe, normalize_ids=normalize_ids)
+        with METRICS.stage("render"):
+            html_ru, html_en = render_profiles(all_profiles)
+        with METRICS.stage("artifacts"):
+            artifact_store.put(key, html_ru, html_en, "\n".join(english_lines(all_profiles)), all_profiles)
+    return {name: f'/artifacts/{key}/{name}' for name in ARTIFACTS}
+
+
+@app.route('/artifacts/<key>/<name>')
+def artifact(key: str, name: str):
+    """
+    Результат /upload: ru.html, en.html, en.txt, bundle.zip или выгрузка
+    profiles.jsonl/.csv/.parquet (параметр download - отдать файлом).
+    Сжатая копия выбирается по Accept-Encoding, при совпадении
+    If-None-Match с ETag отдается 304 без содержимого.
+    """
+    selected = artifact_store.select(key, name, request.headers.get('Accept-Encoding'))
+    if selected is None:
+        return jsonify({'error': 'Результат не найден'}), 404
+    path, encoding = selected
+    etag = ArtifactStore.etag(key, encoding)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL, 'Vary': 'Accept-Encoding'}
+    if etag_matches(request.headers.get('If-None-Match'), etag):
+        return Response(status=304, headers=headers)
+    
+    mimetype, download_name = ARTIFACTS[name]
+    response = send_file(
+        path,
+        mimetype=mimetype,
+        as_attachment='download' in request.args,
+        download_name=download_name,
+        conditional=False,
+        etag=False,
+    )
+    response.headers.update(headers)
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def stream_upload(file):
+    """
+    Отдает страницу результатов по частям, пока архив еще разбирается.
+    Архив читается прямо из загруженного файла, без сохранения на диск.
+    """
+    try:
+        zip_ref = zipfile.ZipFile(file.stream, 'r')
+    except zipfile.BadZipFile:
+        return jsonify({'error': 'Некорректный zip-архив'}), 400
+    
+    try:
+        html_ru_chunks, html_en_chunks = stream_archive_html(zip_ref)
+    except ValueError as e:
+        zip_ref.close()
+        return jsonify({'error': str(e)}), 400
+    
+    return Response(stream_template(
+        'result.html',
+        html_ru_chunks=html_ru_chunks,
+        html_en_chunks=html_en_chunks
+    ), mimetype='text/html')
+
+
+def send_export(profiles: Iterator[Profile], export_format: str):
+    """
+    Отдает профили файлом в формате export_format.
+    Выгрузка буферизуется в SpooledTemporaryFile: крупная уходит на диск.
+    """
+    buffer = tempfile.SpooledTemporaryFile(max_size=app.config['STREAM_SPOOL_MAX_SIZE'])
+    try:
+        export_profiles(profiles, buffer, export_format)
+    except Exception:
+        buffer.close()
+        raise
+    buffer.seek(0)
+    return send_file(
+        buffer,
+        mimetype=EXPORT_FORMATS[export_format],
+        as_attachment=True,
+        download_name=f'editor_profiles.{export_format}'
+    )
+
+
+def export_upload(file, export_format: str):
+    """Разбирает архив и отдает профили файлом JSONL, CSV или Parquet вместо HTML."""
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Неизвестный формат выгрузки: {export_format}'}), 400
+    
+    try:
+        with zipfile.ZipFile(file.stream, 'r') as zip_ref:
+            profiles = iter_archive_profiles(zip_ref, docx_members(zip_ref))
+            dedupe, normalize_ids = dedupe_requested(), normalize_requested()
+            if dedupe or normalize_ids:
+                profiles = iter(postprocess_profiles(list(profiles), dedupe=dedupe, normalize_ids=normalize_ids))
+            return send_export(profiles, export_format)
+    except ImportError as e:
+        # Parquet без установленного pyarrow
+        return jsonify({'error': str(e)}), 400
     except zipfile.BadZipFile:
         return jsonify({'error': 'Некорректный zip-архив'}), 400
     except ValueError as e:
         return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': f'Ошибка обработки: {str(e)}'}), 500
+
+
+def run_archive_job(progress: Callable[[int, int], None], zip_path: Path, dedupe: bool = False,
+                    normalize_ids: bool = False) -> dict:
+    """
+    Задача фоновой обработки архива. Кроме HTML сохраняет профили (JSONL,
+    для /jobs/<id>/export/<формат>) и метрики этой задачи.
+    """
+    try:
+        with METRICS.job() as job_metrics:
+            all_profiles = parse_zip_archive(zip_path, progress=progress, dedupe=dedupe,
+                                             normalize_ids=normalize_ids)
+            with METRICS.stage("render"):
+                html_ru, html_en = render_profiles(all_profiles)
+    except zipfile.BadZipFile:
+        raise ValueError('Некорректный zip-архив')
     finally:
-        # Убеждаемся, что временный файл удален
-        if temp_file_path.exists():
-            temp_file_path.unlink()
+        zip_path.unlink(missing_ok=True)
+    
+    profiles_jsonl = io.BytesIO()
+    write_jsonl(all_profiles, profiles_jsonl)
+    return {
+        'ru.html': html_ru,
+        'en.html': html_en,
+        'profiles.jsonl': profiles_jsonl.getvalue().decode('utf-8'),
+        'metrics.json': json.dumps(job_metrics.snapshot()),
+    }
+
+
+def submit_job(file) -> Tuple[dict, int]:
+    """Сохраняет архив и ставит его обработку в очередь."""
+    job_id = job_manager.create()
+    zip_path = job_manager.job_dir(job_id) / 'archive.zip'
+    with METRICS.stage("save"):
+        file.save(str(zip_path))
+    job_manager.submit(job_id, run_archive_job, zip_path, dedupe_requested(), normalize_requested())
+    
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/jobs/{job_id}',
+        'result_url': f'/jobs/{job_id}/result',
+    }), 202
+
+
+@app.route('/api/parse', methods=['POST'])
+def api_parse():
+    """
+    Разбор для внешних систем: в одном multipart запросе может быть
+    сколько угодно частей .zip и .docx (имя поля любое). Все docx файлы
+    из всех частей разбираются одним пакетом в API_PARSE_WORKERS процессах
+    (по умолчанию по числу ядер, независимо от PARSE_WORKERS для /upload).
+    
+    Returns:
+        JSON {"files": [{"file", "profiles", "error"}, ...], "profiles_count"}
+        в порядке частей запроса; файлы из архива называются "архив.zip/путь.docx".
+        Ошибка в одном файле или архиве не прерывает обработку остальных.
+        С параметром normalize_ids идентификаторы всех профилей запроса
+        нормализуются одним пакетом, а у файла появляется "identifier_flags" -
+        флаги проверки для каждого профиля (см. identifiers.identifier_flags).
+    """
+    parts = list(request.files.items(multi=True))
+    if not parts:
+        return jsonify({'error': 'Файлы не найдены'}), 400
+    
+    # Содержимое читается по мере разбора; архивы открыты до его конца
+    with ExitStack() as archives:
+        entries, pending, sources = collect_parts(
+            ((file.filename, file.stream) for _, file in parts), archives
+        )
+        parsed = [(entry, profiles, error) for entry, (profiles, error) in zip(pending, iter_parsed(sources, app.config['API_PARSE_WORKERS']))]
+    
+    return jsonify(api_result(entries, parsed, normalize_ids=normalize_requested()))
+
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id: str):
+    """
+    Статус фоновой задачи: queued, running, done или error, и прогресс (done / total).
+    У завершенной задачи добавляются ее метрики (время этапов и счетчики).
+    """
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Задача не найдена'}), 404
+    if status['status'] == 'done':
+        metrics = job_manager.result(job_id, 'metrics.json')
+        status['metrics'] = json.loads(metrics) if metrics else None
+    return jsonify(status)
+
+
+@app.route('/jobs/<job_id>/result')
+def job_result(job_id: str):
+    """Результат фоновой задачи; пока задача не завершена - ее статус с кодом 202."""
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Задача не найдена'}), 404
+    if status['status'] == 'error':
+        return jsonify({'error': status['error']}), 400
+    if status['status'] != 'done':
+        return jsonify(status), 202
+    
+    return render_template(
+        'result.html',
+        html_ru=job_manager.result(job_id, 'ru.html'),
+        html_en=job_manager.result(job_id, 'en.html')
+    )
+
+
+@app.route('/jobs/<job_id>/export/<export_format>')
+def job_export(job_id: str, export_format: str):
+    """Профили завершенной фоновой задачи в формате jsonl, csv или parquet."""
+    if export_format not in EXPORT_FORMATS:
+        return jsonify({'error': f'Неизвестный формат выгрузки: {export_format}'}), 400
+    status = job_manager.status(job_id)
+    if status is None:
+        return jsonify({'error': 'Задача не найдена'}), 404
+    if status['status'] == 'error':
+        return jsonify({'error': status['error']}), 400
+    if status['status'] != 'done':
+        return jsonify(status), 202
+    
+    with open(job_manager.result_path(job_id, 'profiles.jsonl'), 'r', encoding='utf-8') as f:
+        try:
+            return send_export(iter_jsonl(f), export_format)
+        except ImportError as e:
+            return jsonify({'error': str(e)}), 400
+
+
+@app.route('/cache_stats')
+def cache_stats():
+    """Счетчики кэша разобранных docx файлов."""
+    return jsonify(parse_cache.stats())
+
+
+@app.route('/metrics')
+def metrics():
+    """
+    Метрики в формате Prometheus: время этапов (save, unzip, parse, load,
+    tables, match, render), счетчики файлов, таблиц, байт и ошибок, кэш.
+    Значения свои у каждого процесса gunicorn.
+    """
+    gauges = {f'parse_cache_{name}': value for name, value in parse_cache.stats().items()}
+    return Response(METRICS.prometheus(gauges=gauges), mimetype='text/plain; version=0.0.4')
 
 
 @app.route('/test_file')
@@ -250,17 +620,17 @@ def test_file():
             profile_info = {
                 'number': i,
                 'ru': {
-                    'fio': profile["ru"].get("ФИО, звание и место работы", ""),
-                    'specialization': profile["ru"].get("Специализация", ""),
-                    'email': profile["ru"].get("Email", ""),
-                    'website': profile["ru"].get("Сайт", ""),
-                    'spin': profile["ru"].get("SPIN", ""),
-                    'scopus': profile["ru"].get("Scopus ID", ""),
-                    'orcid': profile["ru"].get("ORCID", ""),
+                    'fio': profile.ru.name_line,
+                    'specialization': profile.ru.specialization,
+                    'email': profile.ru.email,
+                    'website': profile.ru.website,
+                    'spin': profile.ru.spin,
+                    'scopus': profile.ru.scopus,
+                    'orcid': profile.ru.orcid,
                 },
                 'en': {
-                    'name_affiliation': profile["en"].get("Name, position, affiliation", ""),
-                    'keywords': profile["en"].get("Keywords", ""),
+                    'name_affiliation': profile.en.name_line,
+                    'keywords': profile.en.keywords,
                 }
             }
             result['profiles'].append(profile_info)
@@ -275,6 +645,19 @@ def test_file():
         }), 500
 
 
+def warm_up() -> None:
+    """
+    Прогрев перед fork воркеров (gunicorn --preload, см. gunicorn.conf.py):
+    разбор встроенной анкеты (warmup.py) и компиляция шаблонов Jinja.
+    Метрики прогрева сбрасываются, чтобы не попасть в /metrics.
+    """
+    warmup.warm_up()
+    with app.test_request_context():
+        render_template('index.html')
+        render_template('result.html', html_ru='', html_en='')
+    METRICS.reset()
+
+
 if __name__ == '__main__':
     import os
     port = int(os.environ.get('PORT', 5000))
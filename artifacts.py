@@ -0,0 +1,223 @@
+"""
+Готовые результаты обработки архивов, сохраненные по содержимому архива.
+
+Для каждого архива хранятся русский и английский HTML, английский
+текстовый список, zip с этими тремя файлами и выгрузки профилей в JSONL,
+CSV и (если установлен pyarrow) Parquet. Текстовые файлы сразу
+сжимаются gzip и, если установлен пакет brotli, brotli: при отдаче
+ничего не пересчитывается и не сжимается. Ключ результата не меняется,
+пока не изменился архив, параметры обработки или PARSER_VERSION, поэтому
+адреса результатов постоянны, а ETag строится из ключа.
+"""
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional, Set, Tuple
+
+from editor_parser import PARSER_VERSION
+from export import EXPORT_FORMATS, PARQUET_AVAILABLE, export_profiles
+from models import Profile
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Результаты: имя -> (тип содержимого, имя файла при скачивании)
+ARTIFACTS: Dict[str, Tuple[str, str]] = {
+    "ru.html": ("text/html", "editor_profiles.html"),
+    "en.html": ("text/html", "editor_profiles_en.html"),
+    "en.txt": ("text/plain", "editor_profiles_en.txt"),
+    "bundle.zip": ("application/zip", "editor_profiles.zip"),
+    "profiles.jsonl": (EXPORT_FORMATS["jsonl"], "editor_profiles.jsonl"),
+    "profiles.csv": (EXPORT_FORMATS["csv"], "editor_profiles.csv"),
+}
+if PARQUET_AVAILABLE:
+    ARTIFACTS["profiles.parquet"] = (EXPORT_FORMATS["parquet"], "editor_profiles.parquet")
+
+# Файлы, входящие в bundle.zip
+BUNDLE = ("ru.html", "en.html", "en.txt")
+
+# Выгрузки профилей: имя результата -> формат export_profiles
+EXPORTS = {name: name.rsplit(".", 1)[1] for name in ARTIFACTS if name.startswith("profiles.")}
+
+# zip и parquet уже сжаты, поэтому заранее сжимаются только текстовые результаты
+COMPRESSED = ("ru.html", "en.html", "en.txt", "profiles.jsonl", "profiles.csv")
+
+# Кодировки в порядке предпочтения: (Content-Encoding, суффикс файла)
+ENCODINGS = [("br", ".br"), ("gzip", ".gz")] if brotli else [("gzip", ".gz")]
+
+_KEY_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# Результаты постоянны по ключу, клиент может не перепроверять их год.
+# private: это данные загруженного пользователем архива, общие кэши
+# (прокси, CDN) не должны их сохранять
+CACHE_CONTROL = "private, max-age=31536000, immutable"
+
+
+def _compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=11)
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def accepted_encodings(header: Optional[str]) -> Set[str]:
+    """Кодировки из заголовка Accept-Encoding (без отключенных через q=0)."""
+    accepted = set()
+    for item in (header or "").split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().lower()
+        if quality.startswith("q=") and quality[2:].strip("0.") == "":
+            continue
+        if coding:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Совпадает ли ETag с одним из значений If-None-Match (слабое сравнение)."""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in (tag[2:] if tag.startswith("W/") else tag for tag in tags)
+
+
+class ArtifactStore:
+    """
+    Каталог результатов: подкаталог на ключ, в нем файлы из ARTIFACTS и
+    их сжатые копии (ru.html.gz, ru.html.br, ...).
+
+    Каталог общий для всех воркеров gunicorn. Результат собирается во
+    временном каталоге и переименовывается целиком, поэтому другой воркер
+    видит либо все файлы, либо ничего. Результаты, к которым не
+    обращались дольше ttl секунд, удаляются.
+    """
+
+    def __init__(self, directory: Path, ttl: int = 86400):
+        """
+        Args:
+            directory: Каталог для хранения результатов
+            ttl: Время хранения результата после последнего обращения, в секундах
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+
+    @staticmethod
+    def key(stream: BinaryIO, **options: bool) -> str:
+        """
+        Ключ результата для архива и параметров обработки (dedupe, normalize_ids).
+        Архив читается по частям, после чего поток возвращается в начало.
+        """
+        digest = hashlib.sha256(PARSER_VERSION.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+        digest.update(b"\0")
+        # Другой набор результатов (например, появился pyarrow) - другой ключ
+        digest.update(" ".join(ARTIFACTS).encode("utf-8"))
+        digest.update(b"\0")
+        stream.seek(0)
+        for chunk in iter(lambda: stream.read(1024 * 1024), b""):
+            digest.update(chunk)
+        stream.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def valid_key(key: str) -> bool:
+        return bool(_KEY_RE.match(key))
+
+    @staticmethod
+    def etag(key: str, encoding: Optional[str] = None) -> str:
+        """ETag результата: у сжатых копий свой (содержимое другое)."""
+        return f'"{key}-{encoding}"' if encoding else f'"{key}"'
+
+    def has(self, key: str) -> bool:
+        """Есть ли готовый результат; при обращении продлевает срок хранения."""
+        path = self.directory / key
+        try:
+            os.utime(path)
+        except OSError:
+            return False
+        return path.is_dir()
+
+    def select(self, key: str, name: str,
+               accept_encoding: Optional[str] = None) -> Optional[Tuple[Path, Optional[str]]]:
+        """
+        Файл для отдачи клиенту: (путь, Content-Encoding или None).
+        Сжатая копия выбирается по заголовку Accept-Encoding. Обращение
+        продлевает срок хранения результата, как и has().
+
+        Returns:
+            None, если ключа или имени нет
+        """
+        if name not in ARTIFACTS or not self.valid_key(key):
+            return None
+        path = self.directory / key / name
+        if not path.is_file():
+            return None
+        try:
+            os.utime(path.parent)
+        except OSError:
+            return None
+        if name in COMPRESSED:
+            accepted = accepted_encodings(accept_encoding)
+            for encoding, suffix in ENCODINGS:
+                compressed = path.with_name(name + suffix)
+                if encoding in accepted and compressed.is_file():
+                    return compressed, encoding
+        return path, None
+
+    def put(self, key: str, html_ru: str, html_en: str, english_text: str,
+            profiles: List[Profile]) -> None:
+        """Сохраняет результат: файлы ARTIFACTS и их сжатые копии."""
+        self.expire()
+        if self.has(key):
+            return
+        contents = {
+            "ru.html": html_ru.encode("utf-8"),
+            "en.html": html_en.encode("utf-8"),
+            "en.txt": english_text.encode("utf-8"),
+        }
+        bundle = io.BytesIO()
+        with zipfile.ZipFile(bundle, "w", zipfile.ZIP_DEFLATED) as zip_ref:
+            for name in BUNDLE:
+                zip_ref.writestr(ARTIFACTS[name][1], contents[name])
+        contents["bundle.zip"] = bundle.getvalue()
+        for name, fmt in EXPORTS.items():
+            exported = io.BytesIO()
+            export_profiles(profiles, exported, fmt)
+            contents[name] = exported.getvalue()
+
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.directory, prefix=f"{key}.", suffix=".tmp"))
+        try:
+            for name, data in contents.items():
+                (tmp_dir / name).write_bytes(data)
+                if name in COMPRESSED:
+                    for encoding, suffix in ENCODINGS:
+                        (tmp_dir / (name + suffix)).write_bytes(_compress(data, encoding))
+            # Если другой воркер успел сохранить тот же результат, оставляем его
+            os.rename(tmp_dir, self.directory / key)
+        except OSError as e:
+            if not self.has(key):
+                print(f"Не удалось сохранить результат {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def expire(self) -> None:
+        """Удаляет результаты (и брошенные временные каталоги) старше ttl."""
+        deadline = time.time() - self.ttl
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < deadline:
+                    shutil.rmtree(path, ignore_errors=True)
+            except OSError:
+                continue
@@ -0,0 +1,419 @@
+"""
+ASGI-вариант веб-приложения (Starlette) для большого числа одновременных загрузок.
+
+Запуск:
+    uvicorn asgi:app --host 0.0.0.0 --port $PORT
+
+Тело запроса принимается асинхронно (python-multipart буферизует файлы в
+SpooledTemporaryFile), поэтому медленная загрузка не занимает воркер.
+Разбор docx выполняется в ограниченном пуле процессов. Каждый запрос
+резервирует в очереди пула место под все свои docx файлы, как только
+известен их список; если вместе с уже зарезервированными получается
+больше ASGI_MAX_QUEUE файлов, запрос получает 503 с заголовком
+Retry-After (а при заполненной очереди - сразу, не дожидаясь тела).
+Файлы читаются из архива по мере разбора, не больше PARSE_WINDOW на
+процесс пула одновременно.
+
+Маршруты совпадают с app.py: /, /upload (HTML), /artifacts (результаты /upload),
+/api/parse (JSON), /metrics.
+"""
+import asyncio
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import ExitStack, asynccontextmanager
+from functools import partial
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import FileResponse, JSONResponse, PlainTextResponse, Response
+from starlette.routing import Route
+from starlette.templating import Jinja2Templates
+
+from artifacts import ARTIFACTS, CACHE_CONTROL, ArtifactStore, etag_matches
+from dedupe import dedupe_profiles
+from editor_parser import PARSE_WINDOW, _parse_source, preload_backend
+from identifiers import normalize_profiles
+from metrics import METRICS
+from models import Profile
+from parse_cache import ParseCache
+from renderer import english_lines, render_profiles
+from uploads import api_result, collect_parts, docx_members, iter_member_blobs
+
+TEMPLATES_DIR = Path(__file__).parent / 'templates'
+
+MAX_CONTENT_LENGTH = 50 * 1024 * 1024  # 50MB максимум, как в app.py
+# Количество процессов для парсинга (по умолчанию - по числу ядер)
+PARSE_WORKERS = int(os.environ.get('PARSE_WORKERS') or os.cpu_count() or 1)
+# Способ чтения таблиц: "docx" (python-docx) или "lxml" (быстрый разбор XML)
+PARSER_BACKEND = os.environ.get('PARSER_BACKEND')
+# Сколько docx файлов всех запросов может ждать разбора; сверх этого - 503
+MAX_QUEUE = int(os.environ.get('ASGI_MAX_QUEUE', PARSE_WORKERS * 64))
+# Через сколько секунд клиенту предлагается повторить запрос после 503
+RETRY_AFTER = int(os.environ.get('ASGI_RETRY_AFTER', 2))
+
+METRICS.enabled = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+# До запуска пула процессов: дочерние процессы получат модули готовыми
+preload_backend(PARSER_BACKEND)
+
+parse_cache = ParseCache(
+    max_entries=int(os.environ.get('PARSE_CACHE_SIZE', 1024)),
+    directory=os.environ.get('PARSE_CACHE_DIR'),
+    ttl=int(os.environ.get('PARSE_CACHE_TTL', 7 * 86400)),
+)
+artifact_store = ArtifactStore(
+    os.environ.get('ARTIFACTS_DIR', str(Path(tempfile.gettempdir()) / 'editor_board_artifacts')),
+    ttl=int(os.environ.get('ARTIFACTS_TTL', 86400)),
+)
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+
+class ParsePool:
+    """
+    Пул процессов для разбора docx с учетом длины очереди: queued - число
+    файлов, зарезервированных запросами, которые еще обрабатываются.
+    Все методы вызываются из цикла событий, поэтому счетчик без блокировок.
+    """
+
+    def __init__(self, workers: int, max_queue: int):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.queued = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def start(self) -> None:
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+
+    def shutdown(self) -> None:
+        if self._executor:
+            self._executor.shutdown(cancel_futures=True)
+
+    @property
+    def saturated(self) -> bool:
+        return self.queued >= self.max_queue
+
+    def reserve(self, files: int) -> bool:
+        """Резервирует место под files файлов запроса; False - очередь переполнится."""
+        if self.queued + files > self.max_queue:
+            return False
+        self.queued += files
+        return True
+
+    def release(self, files: int) -> None:
+        """Освобождает место, зарезервированное reserve."""
+        self.queued -= files
+
+    def _restart(self, broken: ProcessPoolExecutor) -> None:
+        """Заменяет пул, в котором аварийно завершился процесс (один раз на пул)."""
+        if self._executor is not broken:
+            return
+        print("Процесс разбора завершился аварийно, пул процессов пересоздается")
+        METRICS.count("pool_restarts")
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.start()
+
+    async def parse(self, blob: bytes) -> Tuple[List[Profile], Optional[str]]:
+        """
+        Разбирает один docx в пуле процессов: (профили, ошибка).
+
+        Если процесс пула аварийно завершился (OOM, падение lxml), пул
+        пересоздается. Файлы, которые в нем разбирались, получают ошибку,
+        как и прочие ошибки разбора в _parse_source; файл, отправленный в
+        уже сломанный пул, разбирается в новом.
+        """
+        loop = asyncio.get_running_loop()
+        parse = partial(_parse_source, backend=PARSER_BACKEND, collect_metrics=METRICS.enabled)
+        executor = self._executor
+        try:
+            future = loop.run_in_executor(executor, parse, blob)
+        except BrokenProcessPool:
+            self._restart(executor)
+            executor = self._executor
+            future = loop.run_in_executor(executor, parse, blob)
+        try:
+            profiles, error, file_metrics = await future
+        except BrokenProcessPool as e:
+            self._restart(executor)
+            METRICS.count("errors")
+            return [], str(e)
+        METRICS.merge(file_metrics)
+        return profiles, error
+
+
+pool = ParsePool(PARSE_WORKERS, MAX_QUEUE)
+
+
+async def parse_sources(sources: Iterable[bytes]) -> List[Tuple[List[Profile], Optional[str]]]:
+    """
+    Разбирает файлы параллельно, в порядке sources; неизмененные берутся
+    из кэша, ошибки не кэшируются. sources читается в потоке по одному
+    файлу и не дальше PARSE_WINDOW файлов на процесс пула вперед.
+    """
+    window = asyncio.Semaphore(PARSE_WINDOW * pool.workers)
+    iterator = iter(sources)
+
+    async def parse_one(blob: bytes):
+        try:
+            key = await run_in_threadpool(ParseCache.key, blob)
+            profiles = await run_in_threadpool(parse_cache.get, key)
+            if profiles is not None:
+                return profiles, None
+            profiles, error = await pool.parse(blob)
+            if not error:
+                await run_in_threadpool(parse_cache.put, key, profiles)
+            return profiles, error
+        finally:
+            window.release()
+
+    tasks = []
+    with METRICS.stage("parse"):
+        try:
+            while True:
+                await window.acquire()
+                blob = await run_in_threadpool(next, iterator, None)
+                if blob is None:
+                    break
+                tasks.append(asyncio.ensure_future(parse_one(blob)))
+            return await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+def overloaded() -> Optional[JSONResponse]:
+    """Ответ 503 с Retry-After, если очередь пула заполнена; иначе None."""
+    if pool.saturated:
+        return unavailable()
+    return None
+
+
+def unavailable() -> JSONResponse:
+    return JSONResponse(
+        {'error': 'Сервер перегружен, повторите запрос позже'},
+        status_code=503,
+        headers={'Retry-After': str(RETRY_AFTER)},
+    )
+
+
+def reserve(files: int) -> Optional[JSONResponse]:
+    """
+    Резервирует место в очереди пула под files файлов запроса (см.
+    ParsePool.reserve); при неудаче - ответ 503, а для запроса, который
+    больше всей очереди, - 413. После разбора место освобождается release.
+    """
+    if files > pool.max_queue:
+        return JSONResponse(
+            {'error': f'Слишком много файлов .docx в запросе (больше {pool.max_queue})'},
+            status_code=413,
+        )
+    if not pool.reserve(files):
+        return unavailable()
+    return None
+
+
+def form_flag(form, request, name: str) -> bool:
+    """Флаг из поля формы или параметра запроса name (как option_requested в app.py)."""
+    return str(form.get(name, request.query_params.get(name, ''))).lower() in ('1', 'true', 'yes', 'on')
+
+
+class BodyTooLarge(Exception):
+    """Тело запроса оказалось больше MAX_CONTENT_LENGTH (см. limit_body)."""
+
+
+def too_large(request) -> Optional[JSONResponse]:
+    """Ответ 413, если заявленный размер тела больше MAX_CONTENT_LENGTH."""
+    length = request.headers.get('content-length')
+    if length and length.isdigit() and int(length) > MAX_CONTENT_LENGTH:
+        return body_too_large(request, None)
+    return None
+
+
+def body_too_large(request, exc: Optional[BodyTooLarge]) -> JSONResponse:
+    return JSONResponse({'error': 'Файл слишком большой'}, status_code=413)
+
+
+def limit_body(request) -> Request:
+    """
+    Запрос, тело которого при чтении (request.form()) прерывается
+    BodyTooLarge после MAX_CONTENT_LENGTH байт: Content-Length может не быть
+    (chunked) или он может не совпадать с телом. Как и в app.py, ограничение
+    проверяется на самом потоке, до того как тело целиком уйдет во
+    временные файлы.
+    """
+    received = 0
+
+    async def receive():
+        nonlocal received
+        message = await request.receive()
+        if message['type'] == 'http.request':
+            received += len(message.get('body', b''))
+            if received > MAX_CONTENT_LENGTH:
+                raise BodyTooLarge()
+        return message
+
+    return Request(request.scope, receive)
+
+
+async def index(request):
+    """Главная страница с формой загрузки."""
+    return FileResponse(TEMPLATES_DIR / 'index.html')
+
+
+async def upload_file(request):
+    """Обработка загруженного zip-архива (как /upload в app.py)."""
+    rejected = overloaded() or too_large(request)
+    if rejected:
+        return rejected
+    request = limit_body(request)
+
+    async with request.form() as form:
+        file = form.get('file')
+        if file is None or isinstance(file, str):
+            return JSONResponse({'error': 'Файл не найден'}, status_code=400)
+        if file.filename == '':
+            return JSONResponse({'error': 'Файл не выбран'}, status_code=400)
+        if not file.filename.lower().endswith('.zip'):
+            return JSONResponse({'error': 'Файл должен быть в формате .zip'}, status_code=400)
+        dedupe = form_flag(form, request, 'dedupe')
+        normalize_ids = form_flag(form, request, 'normalize_ids')
+        key = await run_in_threadpool(
+            partial(ArtifactStore.key, file.file, dedupe=dedupe, normalize_ids=normalize_ids)
+        )
+        if await run_in_threadpool(artifact_store.has, key):
+            # Повторная загрузка того же архива: разбор не нужен
+            METRICS.count("artifacts_reused")
+            return result_page(request, key)
+
+        try:
+            zip_ref = await run_in_threadpool(zipfile.ZipFile, file.file, 'r')
+        except zipfile.BadZipFile:
+            return JSONResponse({'error': 'Некорректный zip-архив'}, status_code=400)
+        with zip_ref:
+            try:
+                members = docx_members(zip_ref)
+            except ValueError as e:
+                return JSONResponse({'error': str(e)}, status_code=400)
+            rejected = reserve(len(members))
+            if rejected:
+                return rejected
+            METRICS.count("jobs")
+            try:
+                results = await parse_sources(iter_member_blobs(zip_ref, members))
+            finally:
+                pool.release(len(members))
+
+    all_profiles = []
+    for info, (profiles, error) in zip(members, results):
+        if error:
+            # Пропускаем файлы с ошибками, но логируем
+            print(f"Ошибка при обработке {Path(info.filename).name}: {error}")
+            continue
+        all_profiles.extend(profiles)
+    await run_in_threadpool(build_artifacts, key, all_profiles, dedupe, normalize_ids)
+    return result_page(request, key)
+
+
+def build_artifacts(key: str, all_profiles: List[Profile], dedupe: bool, normalize_ids: bool) -> None:
+    """Пакетные этапы, HTML и сохранение результатов (в потоке: это работа CPU и диска)."""
+    if normalize_ids:
+        with METRICS.stage("identifiers"):
+            all_profiles = normalize_profiles(all_profiles)
+    if dedupe:
+        all_profiles = dedupe_profiles(all_profiles)
+
+    with METRICS.stage("render"):
+        html_ru, html_en = render_profiles(all_profiles)
+    with METRICS.stage("artifacts"):
+        artifact_store.put(key, html_ru, html_en, "\n".join(english_lines(all_profiles)), all_profiles)
+
+
+def result_page(request, key: str):
+    """Страница результатов со ссылками на готовые результаты архива."""
+    artifacts = {name: f'/artifacts/{key}/{name}' for name in ARTIFACTS}
+    return templates.TemplateResponse(request, 'result.html', {'artifacts': artifacts})
+
+
+async def artifact(request):
+    """Результат /upload с ETag и сжатием (как /artifacts в app.py)."""
+    key, name = request.path_params['key'], request.path_params['name']
+    selected = await run_in_threadpool(artifact_store.select, key, name, request.headers.get('accept-encoding'))
+    if selected is None:
+        return JSONResponse({'error': 'Результат не найден'}, status_code=404)
+    path, encoding = selected
+    etag = ArtifactStore.etag(key, encoding)
+    headers = {'ETag': etag, 'Cache-Control': CACHE_CONTROL, 'Vary': 'Accept-Encoding'}
+    if etag_matches(request.headers.get('if-none-match'), etag):
+        return Response(status_code=304, headers=headers)
+
+    media_type, download_name = ARTIFACTS[name]
+    if encoding:
+        headers['Content-Encoding'] = encoding
+    return FileResponse(
+        path,
+        media_type=media_type,
+        headers=headers,
+        filename=download_name if 'download' in request.query_params else None,
+    )
+
+
+async def api_parse(request):
+    """Пакетный разбор .zip и .docx частей запроса (как /api/parse в app.py)."""
+    rejected = overloaded() or too_large(request)
+    if rejected:
+        return rejected
+    request = limit_body(request)
+
+    async with request.form() as form:
+        normalize_ids = form_flag(form, request, 'normalize_ids')
+        parts = [(value.filename, value.file) for _, value in form.multi_items() if not isinstance(value, str)]
+        if not parts:
+            return JSONResponse({'error': 'Файлы не найдены'}, status_code=400)
+
+        # Содержимое читается по мере разбора; архивы открыты до его конца
+        with ExitStack() as archives:
+            entries, pending, sources = await run_in_threadpool(collect_parts, parts, archives)
+            rejected = reserve(len(pending))
+            if rejected:
+                return rejected
+            try:
+                results = await parse_sources(sources)
+            finally:
+                pool.release(len(pending))
+
+    parsed = [(entry, profiles, error) for entry, (profiles, error) in zip(pending, results)]
+    return JSONResponse(await run_in_threadpool(api_result, entries, parsed, normalize_ids))
+
+
+async def metrics(request):
+    """Метрики в формате Prometheus (см. /metrics в app.py) и загрузка пула."""
+    gauges = {f'parse_cache_{name}': value for name, value in parse_cache.stats().items()}
+    gauges['parse_pool_queued'] = pool.queued
+    gauges['parse_pool_max_queue'] = pool.max_queue
+    return PlainTextResponse(METRICS.prometheus(gauges=gauges), media_type='text/plain; version=0.0.4')
+
+
+@asynccontextmanager
+async def lifespan(app):
+    pool.start()
+    try:
+        yield
+    finally:
+        pool.shutdown()
+
+
+app = Starlette(
+    routes=[
+        Route('/', index),
+        Route('/upload', upload_file, methods=['POST']),
+        Route('/artifacts/{key}/{name}', artifact),
+        Route('/api/parse', api_parse, methods=['POST']),
+        Route('/metrics', metrics),
+    ],
+    exception_handlers={BodyTooLarge: body_too_large},
+    lifespan=lifespan,
+)
@@ -0,0 +1,6 @@
+"""
+Бенчмарки парсера и рендеринга профилей.
+
+Запуск из корня проекта:
+    python -m benchmarks.run --sizes 1,10,100,1000,10000 --output bench.json
+"""
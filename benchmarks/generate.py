@@ -0,0 +1,128 @@
+"""
+Генератор синтетических анкет членов редколлегии в формате docx.
+"""
+import io
+import zipfile
+from copy import deepcopy
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+from docx import Document
+
+from editor_parser import W_T
+
+# Строки анкеты: (подпись, значение ru, значение en). {i} - номер профиля
+QUESTIONNAIRE_ROWS: List[Tuple[str, str, str]] = [
+    ("Фамилия Имя Отчество", "Иванов{i} Иван Иванович", "Ivanov{i} Ivan"),
+    ("Должность в редакции (член редколлегии, главный редактор)", "Член редколлегии", "Editorial Board Member"),
+    ("Ученая степень, ученое звание", "доктор технических наук, профессор", "Doctor of Sciences, Professor"),
+    ("Основное место работы", "Московский университет {i}", "Moscow University {i}"),
+    ("Подразделение организации", "Кафедра механики", "Department of Mechanics"),
+    ("Специализация, ключевые слова", "механика жидкости и газа, турбулентность", "fluid mechanics, turbulence"),
+    ("Адрес личной страницы в интернете URL", "https://example.org/staff/{i}", ""),
+    ("Адрес электронной почты", "ivanov{i}@example.org", ""),
+    ("SPIN-код в eLibrary", "{spin}", ""),
+    ("Scopus Author ID", "{scopus}", ""),
+    ("Researcher ID", "A-{i}-2020", ""),
+    ("ORCID", "0000-0002-1825-0097", ""),
+]
+
+# Незаполненные строки шаблона, которые парсер должен пропускать
+NOISE_ROWS: List[Tuple[str, str, str]] = [
+    ("Researcher ID", "найти на сайте webofscience.com", ""),
+    ("Профиль в РИНЦ", "ВАЖНО: указать ссылку на профиль", ""),
+    ("Примечание", "-", "-"),
+]
+
+# Таблица, не являющаяся анкетой (подписи, даты)
+LAYOUT_ROWS: List[Tuple[str, str]] = [
+    ("Подпись", ""),
+    ("Дата заполнения", "-"),
+]
+
+
+# Позиции строк-подсказок в таблице с шумом
+NOISE_POSITIONS = (3, 8, 12)
+
+
+@lru_cache(maxsize=None)
+def _template_table(columns: int, noise: bool, merged: bool):
+    """
+    Таблица-шаблон анкеты (элемент w:tbl) с подстановками {i}, {spin}, {scopus}.
+    Строится через python-docx один раз и затем копируется для каждой анкеты.
+    """
+    rows = list(QUESTIONNAIRE_ROWS)
+    if noise:
+        for position, row in zip(NOISE_POSITIONS, NOISE_ROWS):
+            rows.insert(position, row)
+
+    table = Document().add_table(rows=len(rows), cols=columns)
+    for r, row in enumerate(rows):
+        for c in range(columns):
+            table.cell(r, c).text = row[c]
+
+    if merged and columns == 3:
+        # Значение без перевода на всю ширину: ru и en в одной ячейке
+        url_row = next(r for r, row in enumerate(rows) if row[0].startswith("Адрес личной"))
+        table.cell(url_row, 1).merge(table.cell(url_row, 2))
+        # Пустая английская колонка, объединенная по вертикали на три строки
+        table.cell(len(rows) - 3, 2).merge(table.cell(len(rows) - 1, 2))
+
+    return table._tbl
+
+
+def make_questionnaire_docx(profiles: int, start: int = 0, columns: Optional[int] = None,
+                            noise: bool = True, merged: bool = True) -> bytes:
+    """
+    Создает docx с несколькими анкетами (по одной таблице на анкету).
+
+    Args:
+        profiles: Количество анкет в документе
+        start: Номер первого профиля (для уникальных ФИО и идентификаторов)
+        columns: 2 или 3 колонки; None - чередовать 3- и 2-колоночные таблицы
+        noise: Добавлять незаполненные строки-подсказки ("найти", "важно")
+        merged: Объединять ячейки (горизонтально и вертикально) в 3-колоночных таблицах
+
+    Returns:
+        Содержимое docx файла
+    """
+    doc = Document()
+    doc.add_paragraph("Анкета члена редакционной коллегии")
+
+    for i in range(start, start + profiles):
+        cols = columns or (3 if i % 2 == 0 else 2)
+        values = {"i": i, "spin": 1000 + i, "scopus": 57190000000 + i}
+        tbl = deepcopy(_template_table(cols, noise, merged))
+        for t in tbl.iter(W_T):
+            if t.text and "{" in t.text:
+                t.text = t.text.format(**values)
+        # Таблица вставляется перед пустым абзацем-разделителем
+        doc.add_paragraph("")._p.addprevious(tbl)
+
+    layout = doc.add_table(rows=len(LAYOUT_ROWS), cols=2)
+    for r, (label, value) in enumerate(LAYOUT_ROWS):
+        layout.cell(r, 0).text = label
+        layout.cell(r, 1).text = value
+
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    return buffer.getvalue()
+
+
+def make_archive(profiles: int, per_file: int = 10, start: int = 0, **options) -> bytes:
+    """
+    Создает zip-архив анкет: profiles анкет по per_file в каждом docx,
+    плюс файл, не являющийся docx (должен пропускаться). Номера анкет
+    начинаются со start, так что архивы с разным start не совпадают.
+    Остальные параметры передаются в make_questionnaire_docx.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for n, offset in enumerate(range(0, profiles, per_file)):
+            count = min(per_file, profiles - offset)
+            archive.writestr(
+                f"journal/anketa_{n:05d}.docx",
+                make_questionnaire_docx(count, start=start + offset, **options),
+            )
+        archive.writestr("journal/scan.pdf", b"%PDF-1.4\n" + b"0" * 4096)
+    return buffer.getvalue()
@@ -0,0 +1,126 @@
+"""
+Нагрузочный тест загрузок: много клиентов одновременно отправляют архив,
+каждый - медленно, порциями, как по мобильной сети.
+
+Сравнение синхронного (gunicorn) и асинхронного (uvicorn) вариантов:
+    gunicorn app:app --workers 2 --bind 127.0.0.1:8000
+    uvicorn asgi:app --port 8001
+    python -m benchmarks.load_test --url http://127.0.0.1:8000/upload
+    python -m benchmarks.load_test --url http://127.0.0.1:8001/upload
+
+Каждая загрузка отправляет свой архив, чтобы кэш разбора не скрывал
+стоимость парсинга. Ответы 503 (сервер перегружен) считаются отдельно
+и повторяются после паузы из заголовка Retry-After.
+"""
+import argparse
+import http.client
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Tuple
+from urllib.parse import urlsplit
+
+from benchmarks.generate import make_archive
+
+
+def multipart_body(filename: str, content: bytes) -> Tuple[bytes, str]:
+    """Тело multipart/form-data с одним файлом в поле file."""
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        "Content-Type: application/zip\r\n\r\n"
+    ).encode("utf-8") + content + f"\r\n--{boundary}--\r\n".encode("utf-8")
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def upload(url: str, body: bytes, content_type: str, chunk_size: int, delay: float) -> Tuple[int, float]:
+    """
+    Отправляет тело порциями по chunk_size байт с паузой delay секунд.
+
+    Returns:
+        (код ответа, значение Retry-After или 0)
+    """
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=300)
+    try:
+        connection.putrequest("POST", parts.path or "/")
+        connection.putheader("Content-Type", content_type)
+        connection.putheader("Content-Length", str(len(body)))
+        connection.endheaders()
+        for start in range(0, len(body), chunk_size):
+            connection.send(body[start:start + chunk_size])
+            if delay:
+                time.sleep(delay)
+        response = connection.getresponse()
+        response.read()
+        return response.status, float(response.getheader("Retry-After") or 0)
+    except (ConnectionError, http.client.HTTPException):
+        # Сервер может закрыть соединение, не дочитав тело (например, после 503)
+        return 0, 1.0
+    finally:
+        connection.close()
+
+
+def run(url: str, requests: int, concurrency: int, profiles: int,
+        chunk_size: int, delay: float) -> Dict[str, Any]:
+    """Выполняет requests загрузок в concurrency потоков и возвращает сводку."""
+    bodies = [
+        multipart_body("archive.zip", make_archive(profiles, start=n * profiles))
+        for n in range(requests)
+    ]
+    latencies = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def one(n: int) -> None:
+        body, content_type = bodies[n]
+        started = time.perf_counter()
+        while True:
+            status, retry_after = upload(url, body, content_type, chunk_size, delay)
+            with lock:
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status not in (0, 503):
+                break
+            time.sleep(retry_after)
+        with lock:
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "url": url,
+        "requests": requests,
+        "concurrency": concurrency,
+        "archive_bytes": len(bodies[0][0]),
+        "seconds": round(elapsed, 3),
+        "uploads_per_second": round(requests / elapsed, 3),
+        "latency_p50": round(latencies[len(latencies) // 2], 3),
+        "latency_p95": round(latencies[int(len(latencies) * 0.95) - 1], 3),
+        "statuses": statuses,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Нагрузочный тест /upload")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/upload")
+    parser.add_argument("--requests", type=int, default=64, help="Всего загрузок")
+    parser.add_argument("--concurrency", type=int, default=32, help="Одновременных клиентов")
+    parser.add_argument("--profiles", type=int, default=20, help="Анкет в архиве")
+    parser.add_argument("--chunk-size", type=int, default=16 * 1024, help="Порция отправки, байт")
+    parser.add_argument("--delay", type=float, default=0.05,
+                        help="Пауза между порциями, с (медленный клиент; 0 - без пауз)")
+    args = parser.parse_args()
+
+    report = run(args.url, args.requests, args.concurrency, args.profiles, args.chunk_size, args.delay)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
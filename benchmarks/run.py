@@ -0,0 +1,153 @@
+"""
+Замер производительности парсера и рендеринга на синтетических анкетах.
+
+Результаты пишутся в JSON, чтобы сравнивать их между релизами:
+    python -m benchmarks.run --sizes 1,10,100,1000,10000 --output bench.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import app
+from benchmarks.generate import make_archive, make_questionnaire_docx
+from editor_parser import (
+    PARSER_VERSION,
+    TABLE_EXTRACTORS,
+    parse_profiles_from_docx,
+    parse_table_to_profile,
+)
+from renderer import make_profile_html, render_profiles
+
+DEFAULT_SIZES = [1, 10, 100, 1000, 10000]
+
+
+def measure(func: Callable[[], Any], repeat: int) -> float:
+    """Лучшее время выполнения func из repeat запусков, в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_size(size: int, per_file: int, repeat: int, workers: int) -> List[Dict[str, Any]]:
+    """Все замеры для size профилей."""
+    results = []
+
+    def record(name: str, seconds: float, **extra: Any) -> None:
+        results.append({
+            "name": name,
+            "size": size,
+            "seconds": round(seconds, 6),
+            "per_profile_us": round(seconds / size * 1e6, 3),
+            **extra,
+        })
+        print(f"  {name:<40} {seconds:10.4f} s")
+
+    documents = [
+        make_questionnaire_docx(min(per_file, size - start), start=start)
+        for start in range(0, size, per_file)
+    ]
+
+    for backend in TABLE_EXTRACTORS:
+        record(
+            f"parse_profiles_from_docx[{backend}]",
+            measure(lambda: [parse_profiles_from_docx(io.BytesIO(doc), backend=backend) for doc in documents], repeat),
+            files=len(documents),
+        )
+
+    tables = [
+        (table, data, data_en)
+        for doc in documents
+        for table, data, data_en in TABLE_EXTRACTORS["lxml"](io.BytesIO(doc))
+    ]
+    record(
+        "parse_table_to_profile",
+        measure(lambda: [parse_table_to_profile(*table) for table in tables], repeat),
+        tables=len(tables),
+    )
+
+    # Оба способа извлечения таблиц обязаны давать одинаковый результат
+    parsed = {
+        backend: [parse_profiles_from_docx(io.BytesIO(doc), backend=backend) for doc in documents]
+        for backend in TABLE_EXTRACTORS
+    }
+    if parsed["docx"] != parsed["lxml"]:
+        raise AssertionError("Результаты docx и lxml отличаются")
+    profiles = [profile for doc_profiles in parsed["lxml"] for profile in doc_profiles]
+    record(
+        "make_profile_html",
+        measure(lambda: [make_profile_html(profile.ru) for profile in profiles], repeat),
+    )
+    record("render_profiles", measure(lambda: render_profiles(profiles), repeat))
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        archive_path = Path(temp_dir) / "archive.zip"
+        archive_path.write_bytes(make_archive(size, per_file=per_file))
+        app.app.config["PARSE_WORKERS"] = workers
+
+        def process_without_cache() -> None:
+            app.parse_cache.clear()
+            app.process_zip_archive(archive_path)
+
+        record(
+            f"process_zip_archive[workers={workers}]",
+            measure(process_without_cache, repeat),
+            archive_bytes=archive_path.stat().st_size,
+        )
+        record(
+            "process_zip_archive[cached]",
+            measure(lambda: app.process_zip_archive(archive_path), repeat),
+        )
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарки парсера анкет")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="Количество профилей через запятую")
+    parser.add_argument("--per-file", type=int, default=10,
+                        help="Анкет в одном docx файле")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Число повторов (берется лучший результат)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Процессов для process_zip_archive")
+    parser.add_argument("--output", default="bench_results.json",
+                        help="Файл для результатов в формате JSON")
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",")]
+    results = []
+    for size in sizes:
+        print(f"Профилей: {size}")
+        results.extend(bench_size(size, args.per_file, args.repeat, args.workers))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "parser_version": PARSER_VERSION,
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "per_file": args.per_file,
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Время холодного старта консольного режима (main.py) и веб-приложения (app.py).
+
+Каждый замер - новый процесс интерпретатора:
+    python -m benchmarks.startup --output startup.json
+
+Для gunicorn сравниваются запуск без --preload (каждый воркер сам
+импортирует модули и впервые разбирает анкету на первом запросе) и запуск
+как в Procfile (--preload и app.warm_up в главном процессе, см. gunicorn.conf.py).
+Первый запрос отправляется сразу во все воркеры одновременно, так что
+в задержке учитывается самый медленный воркер.
+"""
+import argparse
+import http.client
+import json
+import os
+import platform
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from benchmarks.load_test import multipart_body
+from warmup import make_warmup_docx
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Варианты запуска gunicorn: имя -> дополнительные аргументы
+GUNICORN_MODES = {
+    "cold": [],
+    "preload_warmup": ["--preload"],
+}
+
+
+def run_best(args: List[str], repeat: int, cwd: Optional[Path] = None) -> float:
+    """Лучшее время выполнения команды из repeat запусков, в секундах."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(args, cwd=cwd or ROOT, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench_cli(repeat: int) -> List[Dict[str, Any]]:
+    """Импорт main.py, --help и сборка HTML из одной анкеты."""
+    results = []
+    python = sys.executable
+    results.append({"name": "import main", "seconds": run_best([python, "-c", "import main"], repeat)})
+    results.append({"name": "main.py --help", "seconds": run_best([python, "main.py", "--help"], repeat)})
+    with tempfile.TemporaryDirectory() as temp_dir:
+        (Path(temp_dir) / "profiles").mkdir()
+        (Path(temp_dir) / "profiles" / "anketa.docx").write_bytes(make_warmup_docx())
+        results.append({
+            "name": "main.py build (1 анкета)",
+            "seconds": run_best([python, str(ROOT / "main.py")], repeat, cwd=Path(temp_dir)),
+        })
+    results.append({"name": "import app", "seconds": run_best([python, "-c", "import app"], repeat)})
+    return results
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def request(port: int, method: str, path: str, body: bytes = b"", content_type: str = "") -> int:
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+    try:
+        headers = {"Content-Type": content_type} if content_type else {}
+        connection.request(method, path, body=body or None, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return response.status
+    finally:
+        connection.close()
+
+
+def pss_mb(pid: int) -> Optional[float]:
+    """Суммарный PSS процесса и его потомков (Linux), МБ; None - если недоступно."""
+    total = 0
+    pids = [pid]
+    try:
+        children = subprocess.run(["pgrep", "-P", str(pid)], capture_output=True, text=True).stdout.split()
+        pids.extend(int(child) for child in children)
+        for process in pids:
+            with open(f"/proc/{process}/smaps_rollup", encoding="utf-8") as f:
+                for line in f:
+                    if line.startswith("Pss:"):
+                        total += int(line.split()[1])
+    except (OSError, ValueError):
+        return None
+    return round(total / 1024, 1)
+
+
+def bench_gunicorn(mode: str, workers: int) -> Dict[str, Any]:
+    """Время до готовности и первый запрос /api/parse во всех воркерах."""
+    port = free_port()
+    args = [sys.executable, "-m", "gunicorn", "app:app", "--workers", str(workers),
+            "--bind", f"127.0.0.1:{port}", *GUNICORN_MODES[mode]]
+    env = dict(os.environ, METRICS_ENABLED="false")
+    body, content_type = multipart_body("anketa.docx", make_warmup_docx())
+
+    started = time.perf_counter()
+    server = subprocess.Popen(args, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            try:
+                if request(port, "GET", "/") == 200:
+                    break
+            except OSError:
+                pass
+            if server.poll() is not None:
+                raise RuntimeError(f"gunicorn завершился с кодом {server.returncode}")
+            time.sleep(0.01)
+        ready = time.perf_counter() - started
+
+        def first(_: int) -> float:
+            request_started = time.perf_counter()
+            status = request(port, "POST", "/api/parse", body, content_type)
+            if status != 200:
+                raise RuntimeError(f"/api/parse: {status}")
+            return time.perf_counter() - request_started
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            latencies = list(executor.map(first, range(workers)))
+        memory = pss_mb(server.pid)
+    finally:
+        server.send_signal(signal.SIGTERM)
+        server.wait(timeout=30)
+
+    return {
+        "name": f"gunicorn[{mode}]",
+        "workers": workers,
+        "ready_seconds": round(ready, 4),
+        "first_parse_max_seconds": round(max(latencies), 4),
+        "first_parse_min_seconds": round(min(latencies), 4),
+        "pss_mb": memory,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Время холодного старта main.py и app.py")
+    parser.add_argument("--repeat", type=int, default=5, help="Число повторов (берется лучший результат)")
+    parser.add_argument("--workers", type=int, default=2, help="Воркеров gunicorn")
+    parser.add_argument("--output", default="startup_results.json", help="Файл для результатов в формате JSON")
+    args = parser.parse_args()
+
+    results = []
+    for result in bench_cli(args.repeat):
+        result["seconds"] = round(result["seconds"], 4)
+        print(f"  {result['name']:<40} {result['seconds']:10.4f} s")
+        results.append(result)
+    for mode in GUNICORN_MODES:
+        runs = [bench_gunicorn(mode, args.workers) for _ in range(args.repeat)]
+        result = min(runs, key=lambda run: run["ready_seconds"] + run["first_parse_max_seconds"])
+        print(f"  {result['name']:<40} готов {result['ready_seconds']:.4f} s, "
+              f"первый разбор {result['first_parse_max_seconds']:.4f} s, PSS {result['pss_mb']} MB")
+        results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Результаты сохранены в {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,247 @@
+"""
+Поиск и объединение повторяющихся профилей (один редактор в анкетах
+нескольких журналов).
+"""
+import re
+from dataclasses import fields, replace
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from models import Profile
+
+_ORCID_RE = re.compile(r"(\d{4})-?(\d{4})-?(\d{4})-?(\d{3}[\dX])")
+_RESEARCHER_RE = re.compile(r"[A-Z]{1,3}-\d{4}-\d{4}")
+_NON_DIGIT_RE = re.compile(r"\D")
+_SPACES_RE = re.compile(r"\s+")
+
+
+def normalize_orcid(value: str) -> str:
+    """0000-0002-1825-0097 из любой записи (с префиксом https://orcid.org/, без дефисов)."""
+    match = _ORCID_RE.search(value.upper())
+    return "-".join(match.groups()) if match else ""
+
+
+def normalize_digits(value: str) -> str:
+    """Только цифры (Scopus Author ID, SPIN-код)."""
+    return _NON_DIGIT_RE.sub("", value)
+
+
+def normalize_researcher_id(value: str) -> str:
+    """Researcher ID вида A-1234-2010."""
+    match = _RESEARCHER_RE.search(value.upper().replace(" ", ""))
+    return match.group(0) if match else ""
+
+
+def normalize_email(value: str) -> str:
+    """Адрес в нижнем регистре, без mailto: и пробелов."""
+    value = value.strip().lower()
+    if value.startswith("mailto:"):
+        value = value[len("mailto:"):]
+    return value if "@" in value else ""
+
+
+def normalize_name(line: str) -> str:
+    """ФИО (часть строки до первой запятой) без регистра, точек и лишних пробелов."""
+    name = line.split(",", 1)[0].lower().replace("ё", "е").replace(".", " ")
+    return _SPACES_RE.sub(" ", name).strip()
+
+
+# Ключи, по которым профили считаются одним человеком: (имя ключа, поле ProfileRu, нормализация)
+DEDUPE_KEYS: Tuple[Tuple[str, str, Callable[[str], str]], ...] = (
+    ("orcid", "orcid", normalize_orcid),
+    ("scopus", "scopus", normalize_digits),
+    ("researcher", "researcher", normalize_researcher_id),
+    ("spin", "spin", normalize_digits),
+    ("email", "email", normalize_email),
+    ("name", "name_line", normalize_name),
+)
+
+# Слабые ключи: совпадение объединяет профили, только если их идентификаторы
+# (остальные ключи) не противоречат друг другу - полные тезки не редкость
+WEAK_KEYS = ("name",)
+
+
+def completeness(profile: Profile) -> int:
+    """Число заполненных полей профиля."""
+    return sum(
+        1
+        for part in (profile.ru, profile.en)
+        for value in (getattr(part, field.name) for field in fields(part))
+        if value and value.strip() and value.strip() != "-"
+    )
+
+
+class ProfileIndex:
+    """
+    Индекс профилей для поиска дубликатов.
+
+    Для каждого профиля нормализуются идентификаторы (DEDUPE_KEYS); профили
+    с хотя бы одним общим идентификатором объединяются в группу через систему
+    непересекающихся множеств. Каждый ключ ищется в словаре, поэтому
+    построение линейно по числу профилей, без попарного сравнения.
+
+    Совпадение только по ФИО (WEAK_KEYS) проверяется после добавления всех
+    профилей: группы объединяются, если ни один идентификатор (ORCID,
+    Scopus ID, Researcher ID, SPIN, email) в них не расходится. Тезки
+    с разными идентификаторами остаются отдельными профилями (см. conflicts).
+    Сами профили не изменяются (они могут быть общими с кэшем).
+    """
+
+    def __init__(self, keys: Optional[Iterable[str]] = None):
+        """
+        Args:
+            keys: Имена используемых ключей из DEDUPE_KEYS (по умолчанию все);
+                  например, без "name" профили без общих идентификаторов
+                  не объединяются даже при одинаковом ФИО
+        """
+        wanted = set(keys) if keys is not None else None
+        self._keys = [key for key in DEDUPE_KEYS if wanted is None or key[0] in wanted]
+        self._profiles: List[Profile] = []
+        self._parent: List[int] = []
+        self._owners: Dict[Tuple[str, str], int] = {}
+        # Значения идентификаторов группы (по корню): ключ -> множество значений
+        self._ids: List[Dict[str, Set[str]]] = []
+        # Профили с одинаковым значением слабого ключа, в порядке появления
+        self._weak: Dict[Tuple[str, str], List[int]] = {}
+        self._weak_linked = True
+        self._conflicts: List[List[int]] = []
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+    def add(self, profile: Profile) -> None:
+        """Добавляет профиль и объединяет его с уже известными по общим ключам."""
+        idx = len(self._profiles)
+        self._profiles.append(profile)
+        self._parent.append(idx)
+        self._ids.append({})
+        ru = profile.ru
+        for name, field, normalize_value in self._keys:
+            value = normalize_value(getattr(ru, field))
+            if not value:
+                continue
+            if name in WEAK_KEYS:
+                self._weak.setdefault((name, value), []).append(idx)
+                self._weak_linked = False
+                continue
+            self._ids[idx].setdefault(name, set()).add(value)
+            owner = self._owners.setdefault((name, value), idx)
+            if owner != idx:
+                self._union(owner, idx)
+
+    def extend(self, profiles: Iterable[Profile]) -> None:
+        """Добавляет несколько профилей."""
+        for profile in profiles:
+            self.add(profile)
+
+    def groups(self) -> List[List[int]]:
+        """Номера профилей по группам, в порядке первого появления."""
+        self._link_weak()
+        groups: Dict[int, List[int]] = {}
+        for idx in range(len(self._profiles)):
+            groups.setdefault(self._find(idx), []).append(idx)
+        return list(groups.values())
+
+    def duplicates(self) -> List[List[Profile]]:
+        """Группы из нескольких профилей (для вывода предупреждений)."""
+        return [[self._profiles[idx] for idx in group] for group in self.groups() if len(group) > 1]
+
+    def conflicts(self) -> List[List[Profile]]:
+        """
+        Профили с одинаковым ФИО, не объединенные из-за разных идентификаторов
+        (по одному на группу; для вывода предупреждений).
+        """
+        self._link_weak()
+        return [[self._profiles[idx] for idx in roots] for roots in self._conflicts]
+
+    def profiles(self) -> List[Profile]:
+        """
+        По одному профилю на группу, в порядке первого появления.
+
+        Берется самый полный профиль группы (при равенстве - первый), а его
+        пустые поля заполняются из остальных профилей группы.
+        """
+        return [self._merge([self._profiles[idx] for idx in group]) for group in self.groups()]
+
+    @staticmethod
+    def _merge(group: List[Profile]) -> Profile:
+        if len(group) == 1:
+            return group[0]
+        best = max(group, key=completeness)
+        merged = Profile(replace(best.ru), replace(best.en))
+        for other in group:
+            if other is best:
+                continue
+            for target, source in ((merged.ru, other.ru), (merged.en, other.en)):
+                for field in fields(source):
+                    value = getattr(source, field.name)
+                    if value and not getattr(target, field.name):
+                        setattr(target, field.name, value)
+        return merged
+
+    def _link_weak(self) -> None:
+        """
+        Объединяет группы с общим слабым ключом. Группы с идентификаторами
+        объединяются, если не расходятся ровно с одной из уже собранных;
+        профили без идентификаторов - только если такая группа одна
+        (иначе непонятно, к какому из тезок они относятся).
+        """
+        if self._weak_linked:
+            return
+        self._conflicts = []
+        for members in self._weak.values():
+            roots = list(dict.fromkeys(self._find(idx) for idx in members))
+            identified: List[int] = []
+            for root in roots:
+                if not self._ids[root]:
+                    continue
+                candidates = [other for other in identified if not self._conflict(other, root)]
+                if len(candidates) == 1:
+                    self._union(candidates[0], root)
+                    identified = list(dict.fromkeys(self._find(other) for other in identified))
+                else:
+                    identified.append(root)
+            if len(identified) <= 1:
+                for root in roots:
+                    self._union(roots[0], root)
+            roots = list(dict.fromkeys(self._find(idx) for idx in members))
+            if len(roots) > 1:
+                self._conflicts.append(roots)
+        self._weak_linked = True
+
+    def _conflict(self, root_a: int, root_b: int) -> bool:
+        """Есть ли ключ, заполненный в обеих группах, но без общих значений."""
+        ids_a, ids_b = self._ids[root_a], self._ids[root_b]
+        return any(name in ids_b and values.isdisjoint(ids_b[name]) for name, values in ids_a.items())
+
+    def _find(self, idx: int) -> int:
+        parent = self._parent
+        root = idx
+        while parent[root] != root:
+            root = parent[root]
+        # Сжатие путей
+        while parent[idx] != root:
+            parent[idx], idx = root, parent[idx]
+        return root
+
+    def _union(self, a: int, b: int) -> None:
+        root_a, root_b = self._find(a), self._find(b)
+        if root_a != root_b:
+            # Корнем остается более ранний профиль
+            if root_b < root_a:
+                root_a, root_b = root_b, root_a
+            self._parent[root_b] = root_a
+            for name, values in self._ids[root_b].items():
+                self._ids[root_a].setdefault(name, set()).update(values)
+            self._ids[root_b] = {}
+
+
+def dedupe_profiles(profiles: Iterable[Profile], keys: Optional[Iterable[str]] = None) -> List[Profile]:
+    """Профили без дубликатов (см. ProfileIndex.profiles), с предупреждением о каждой группе."""
+    index = ProfileIndex(keys)
+    index.extend(profiles)
+    for group in index.duplicates():
+        names = "; ".join(profile.ru.name_line.split(",", 1)[0] for profile in group)
+        print(f"Объединены дубликаты ({len(group)}): {names}")
+    for group in index.conflicts():
+        print(f"Не объединены тезки с разными идентификаторами ({len(group)}): {group[0].ru.name_line.split(',', 1)[0]}")
+    return index.profiles()
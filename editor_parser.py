@@ -1,9 +1,175 @@
-from docx import Document
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from functools import partial
+from io import BytesIO
+from itertools import chain, islice
+from lxml import etree
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+import os
 import re
+import zipfile
 
-def parse_table_to_profile(table, data: Dict[str, str], data_en: Dict[str, str]) -> Dict[str, Dict[str, str]]:
+from metrics import METRICS
+from models import Profile, ProfileEn, ProfileRu
+
+# Источник документа: путь, содержимое файла или открытый файловый объект
+DocxSource = Union[Path, str, bytes, BinaryIO]
+
+# Таблица документа: (объект таблицы, русские данные, английские данные)
+TableData = Tuple[Any, Dict[str, str], Dict[str, str]]
+
+# Пул процессов разбора: factory(None) - текущий пул, factory(broken) -
+# замена пула broken, в котором аварийно завершился процесс
+ExecutorFactory = Callable[[Optional[Executor]], Executor]
+
+# Версия логики разбора: меняется при любом изменении результата парсинга,
+# чтобы сбросить сохраненные результаты (см. parse_cache.py)
+PARSER_VERSION = "2"
+
+# Способ извлечения таблиц по умолчанию: "docx" (python-docx) или "lxml"
+DEFAULT_BACKEND = os.environ.get("EDITOR_PARSER_BACKEND", "docx")
+
+# Сколько первых строк таблицы смотрит classify_table
+CLASSIFY_ROWS = 6
+
+# Сколько файлов на процесс пула одновременно в работе (см. iter_parse_many)
+PARSE_WINDOW = 2
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+REL_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+W_BODY = f"{{{W_NS}}}body"
+W_TBL = f"{{{W_NS}}}tbl"
+W_TR = f"{{{W_NS}}}tr"
+W_TC = f"{{{W_NS}}}tc"
+W_P = f"{{{W_NS}}}p"
+W_R = f"{{{W_NS}}}r"
+W_HYPERLINK = f"{{{W_NS}}}hyperlink"
+W_T = f"{{{W_NS}}}t"
+W_TAB = f"{{{W_NS}}}tab"
+W_PTAB = f"{{{W_NS}}}ptab"
+W_BR = f"{{{W_NS}}}br"
+W_CR = f"{{{W_NS}}}cr"
+W_NO_BREAK_HYPHEN = f"{{{W_NS}}}noBreakHyphen"
+W_TYPE = f"{{{W_NS}}}type"
+W_VAL = f"{{{W_NS}}}val"
+
+_NON_ALNUM_RE = re.compile(r"[^a-zа-я0-9]")
+
+
+def normalize(text: str) -> str:
+    """Приводит подпись поля к виду для сравнения: нижний регистр, только буквы и цифры."""
+    return _NON_ALNUM_RE.sub("", text.lower())
+
+
+def is_valid_field(value: str) -> bool:
+    """Проверяет, что значение заполнено, а не оставлено подсказкой из шаблона анкеты."""
+    lowered = value.lower()
+    return (
+        value.strip()
+        and value.strip() != "-"
+        and "найти" not in lowered
+        and "важно" not in lowered
+        and "профиль" not in lowered
+    )
+
+
+def clean_text(text: str) -> str:
+    return text.replace("-\n", "").replace("\n", " ").strip()
+
+
+class FieldMatcher:
+    """
+    Сопоставляет подписи строк анкеты с полями профиля.
+    
+    Синонимы каждого поля нормализуются один раз при создании. Поле получает
+    значение первой (в порядке строк таблицы) строки, подпись которой содержит
+    любой из синонимов и значение которой заполнено.
+    """
+
+    def __init__(self, fields: Dict[str, List[str]]):
+        """
+        Args:
+            fields: Поле профиля -> список подписей-синонимов
+        """
+        self.fields = fields
+        self._targets = [
+            (name, [normalize(synonym) for synonym in synonyms])
+            for name, synonyms in fields.items()
+        ]
+
+    def match(self, source: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+        """
+        Один проход по строкам таблицы.
+        
+        Returns:
+            Поле -> (подпись строки, значение) для найденных полей
+        """
+        matches = {}
+        for key, value in source.items():
+            if len(matches) == len(self._targets):
+                break
+            nk = normalize(key)
+            stripped = None
+            for name, targets in self._targets:
+                if name in matches or not any(target in nk for target in targets):
+                    continue
+                if stripped is None:
+                    stripped = value.strip()
+                    valid = is_valid_field(stripped)
+                if valid:
+                    matches[name] = (key, stripped)
+        return matches
+
+    def values(self, source: Dict[str, str]) -> Dict[str, str]:
+        """Значения всех полей; ненайденные поля - пустая строка."""
+        matches = self.match(source)
+        return {name: matches[name][1] if name in matches else "" for name in self.fields}
+
+
+# Поля русской колонки анкеты в порядке приоритета синонимов
+RU_FIELDS = FieldMatcher({
+    "full_name": ["ФИО", "Фамилия Имя Отчество"],
+    "last_name": ["Фамилия"],
+    "first_name": ["Имя"],
+    "patronymic": ["Отчество"],
+    "position": ["должность в редакции", "редколлегии", "позиция", "членство"],
+    "degree_title": ["ученое звание", "учёное звание", "ученая степень", "степень", "звание"],
+    "org": ["основное место работы"],
+    "department": ["подразделение организации"],
+    "specialization": ["специализация", "ключевые слова", "область интересов"],
+    "website": ["личной страницы", "url", "сайт"],
+    "email": ["электронной почты", "email"],
+    "spin": ["spin"],
+    "scopus": ["scopus author id", "scopus id", "scopus"],
+    "researcher": ["researcher id"],
+    "orcid": ["orcid"],
+})
+
+# Поля английской колонки анкеты (подписи строк те же, что и у русской)
+EN_FIELDS = FieldMatcher({
+    "full_name": ["ФИО", "Фамилия Имя Отчество"],
+    "position": ["должность в редакции", "редколлегии", "позиция", "членство"],
+    "degree_title": ["ученое звание", "учёное звание", "ученая степень", "степень", "звание"],
+    "org": ["основное место работы"],
+    "department": ["подразделение организации"],
+    "keywords": ["ключевые слова", "keywords", "область интересов"],
+})
+
+# Нормализованные подписи, по которым таблица признается анкетой: (подпись, поле)
+_QUESTIONNAIRE_LABELS = [
+    (target, name)
+    for matcher in (RU_FIELDS, EN_FIELDS)
+    for name, targets in matcher._targets
+    for target in targets
+]
+
+
+def parse_table_to_profile(table, data: Dict[str, str], data_en: Dict[str, str]) -> Profile:
     """
     Парсит одну таблицу в профиль.
     
@@ -13,128 +179,302 @@ def parse_table_to_profile(table, data: Dict[str, str], data_en: Dict[str, str])
         data_en: Словарь для английских данных
     
     Returns:
-        Профиль в формате {"ru": {...}, "en": {...}}
-    """
-    def normalize(text: str) -> str:
-        return re.sub(r"[^a-zа-я0-9]", "", text.lower())
-
-    def is_valid_field(value: str) -> bool:
-        lowered = value.lower()
-        return (
-            value.strip()
-            and value.strip() != "-"
-            and "найти" not in lowered
-            and "важно" not in lowered
-            and "профиль" not in lowered
-        )
-
-    def get(possible_keys, source):
-        for key in source:
-            nk = normalize(key)
-            for target in possible_keys:
-                if normalize(target) in nk:
-                    val = source[key].strip()
-                    if is_valid_field(val):
-                        return val
-        return ""
-
-    def clean_text(text: str) -> str:
-        return text.replace("-\n", "").replace("\n", " ").strip()
+        Профиль (Profile; прежний словарный формат - Profile.to_dict())
+    """
+    ru = RU_FIELDS.values(data)
+    en = EN_FIELDS.values(data_en)
 
-    full_name = get(["ФИО", "Фамилия Имя Отчество"], data)
+    full_name = ru["full_name"]
     if not full_name:
-        last = get(["Фамилия"], data)
-        first = get(["Имя"], data)
-        patronymic = get(["Отчество"], data)
-        full_name = f"{last} {first} {patronymic}".strip()
-
-    position = get(["должность в редакции", "редколлегии", "позиция", "членство"], data)
-    degree_title = get(["ученое звание", "учёное звание", "ученая степень", "степень", "звание"], data)
-    org = get(["основное место работы"], data)
-    department = get(["подразделение организации"], data)
-
-    specialization = get(["специализация", "ключевые слова", "область интересов"], data)
-    website = get(["личной страницы", "url", "сайт"], data)
-    email = get(["электронной почты", "email"], data)
-    spin = get(["spin"], data)
-    scopus = get(["scopus author id", "scopus id", "scopus"], data)
-    researcher = get(["researcher id"], data)
-    orcid = get(["orcid"], data)
-
-    # Английские поля
-    full_name_en = get(["ФИО", "Фамилия Имя Отчество"], data_en)
-    position_en = get(["должность в редакции", "редколлегии", "позиция", "членство"], data_en)
-    degree_title_en = get(["ученое звание", "учёное звание", "ученая степень", "степень", "звание"], data_en)
-    org_en = get(["основное место работы"], data_en)
-    department_en = get(["подразделение организации"], data_en)
-    keywords_en = get(["ключевые слова", "keywords", "область интересов"], data_en)
+        full_name = f"{ru['last_name']} {ru['first_name']} {ru['patronymic']}".strip()
 
     line1_ru = ", ".join(dict.fromkeys(
-        filter(None, [full_name, position, degree_title, org, department])
+        filter(None, [full_name, ru["position"], ru["degree_title"], ru["org"], ru["department"]])
     ))
 
     line1_en = ", ".join(dict.fromkeys(
-        filter(None, [full_name_en, position_en, degree_title_en, org_en, department_en])
+        filter(None, [en["full_name"], en["position"], en["degree_title"], en["org"], en["department"]])
     ))
 
-    return {
-        "ru": {
-            "ФИО, звание и место работы": clean_text(line1_ru),
-            "Специализация": clean_text(specialization),
-            "Сайт": clean_text(website),
-            "Email": clean_text(email),
-            "SPIN": clean_text(spin),
-            "Scopus ID": clean_text(scopus),
-            "Researcher ID": clean_text(researcher),
-            "ORCID": clean_text(orcid)
-        },
-        "en": {
-            "Name, position, affiliation": clean_text(line1_en),
-            "Keywords": clean_text(keywords_en)
-        }
-    }
-
-
-def parse_profile_from_docx(filepath: Path) -> Dict[str, Dict[str, str]]:
+    return Profile(
+        ProfileRu(
+            name_line=clean_text(line1_ru),
+            specialization=clean_text(ru["specialization"]),
+            website=clean_text(ru["website"]),
+            email=clean_text(ru["email"]),
+            spin=clean_text(ru["spin"]),
+            scopus=clean_text(ru["scopus"]),
+            researcher=clean_text(ru["researcher"]),
+            orcid=clean_text(ru["orcid"]),
+        ),
+        ProfileEn(
+            name_line=clean_text(line1_en),
+            keywords=clean_text(en["keywords"]),
+        ),
+    )
+
+
+def parse_profile_from_docx(filepath: Path) -> Profile:
     """
     Парсит первый профиль из документа (для обратной совместимости).
     Использует parse_profiles_from_docx и возвращает первый профиль.
     """
     profiles = parse_profiles_from_docx(filepath)
-    return profiles[0] if profiles else {
-        "ru": {"ФИО, звание и место работы": "", "Специализация": "", "Сайт": "", 
-               "Email": "", "SPIN": "", "Scopus ID": "", "Researcher ID": "", "ORCID": ""},
-        "en": {"Name, position, affiliation": "", "Keywords": ""}
-    }
+    return profiles[0] if profiles else Profile(ProfileRu(), ProfileEn())
+
+
+def _rows_to_data(rows: Iterable[List[str]]) -> Tuple[Dict[str, str], Dict[str, str]]:
+    """
+    Собирает словари данных из строк таблицы.
+    Каждая строка - тексты первых трех ячеек (ключ, значение ru, значение en).
+    """
+    data = {}
+    data_en = {}
+    for cells in rows:
+        if len(cells) >= 2:
+            key = cells[0].strip()
+            value_ru = cells[1].strip()
+            value_en = cells[2].strip() if len(cells) >= 3 else ""
+            if key:
+                data[key] = value_ru
+                data_en[key] = value_en
+    return data, data_en
 
 
-def parse_profiles_from_docx(filepath: Path) -> List[Dict[str, Dict[str, str]]]:
+def extract_tables_docx(filepath: Union[Path, BinaryIO], classify: bool = True) -> Iterator[TableData]:
+    """
+    Извлекает данные таблиц через объектную модель python-docx.
+    При classify таблицы, отброшенные classify_table, не отдаются.
+    """
+    # python-docx импортируется при первом использовании: способу lxml он не нужен
+    from docx import Document
+
+    with METRICS.stage("load"):
+        doc = Document(filepath)
+    for table in doc.tables:
+        if classify and _rejected(table._tbl):
+            continue
+        with METRICS.stage("tables"):
+            rows = ([cell.text for cell in row.cells[:3]] for row in table.rows)
+            data, data_en = _rows_to_data(rows)
+        yield table, data, data_en
+
+
+def _run_text(run) -> str:
+    """Текст w:r так же, как его возвращает python-docx (Run.text)."""
+    parts = []
+    for child in run:
+        tag = child.tag
+        if tag == W_T:
+            parts.append(child.text or "")
+        elif tag == W_TAB or tag == W_PTAB:
+            parts.append("\t")
+        elif tag == W_BR:
+            if child.get(W_TYPE, "textWrapping") == "textWrapping":
+                parts.append("\n")
+        elif tag == W_CR:
+            parts.append("\n")
+        elif tag == W_NO_BREAK_HYPHEN:
+            parts.append("-")
+    return "".join(parts)
+
+
+def _cell_text(tc) -> str:
+    """Текст w:tc так же, как его возвращает python-docx (_Cell.text)."""
+    paragraphs = []
+    for p in tc.iterchildren(W_P):
+        parts = []
+        for child in p:
+            if child.tag == W_R:
+                parts.append(_run_text(child))
+            elif child.tag == W_HYPERLINK:
+                parts.extend(_run_text(r) for r in child.iterchildren(W_R))
+        paragraphs.append("".join(parts))
+    return "\n".join(paragraphs)
+
+
+def _tc_property(tc, name: str) -> Optional[str]:
+    """Значение w:val свойства ячейки (w:tcPr/w:<name>), None если свойства нет."""
+    prop = tc.find(f"{{{W_NS}}}tcPr/{{{W_NS}}}{name}")
+    if prop is None:
+        return None
+    return prop.get(W_VAL, "")
+
+
+def _iter_table_rows(tbl) -> Iterator[List[str]]:
+    """
+    Отдает тексты первых трех ячеек каждой строки w:tbl.
+    
+    Повторяет логику python-docx _Row.cells: ячейка с gridSpan повторяется
+    по числу занимаемых колонок, а продолжение вертикального объединения
+    (vMerge="continue") заменяется ячейкой из строки выше.
+    """
+    above = None  # {смещение в сетке: (корневая ячейка, gridSpan)} для предыдущей строки
+    for tr in tbl.iterchildren(W_TR):
+        grid_before = tr.find(f"{{{W_NS}}}trPr/{{{W_NS}}}gridBefore")
+        offset = int(grid_before.get(W_VAL)) if grid_before is not None else 0
+
+        current = {}
+        cells = []
+        for tc in tr.iterchildren(W_TC):
+            span = int(_tc_property(tc, "gridSpan") or 1)
+            if _tc_property(tc, "vMerge") in ("", "continue"):
+                if above is None:
+                    raise ValueError("no tr above topmost tr in w:tbl")
+                if offset not in above:
+                    raise ValueError(f"no `tc` element at grid_offset={offset}")
+                current[offset] = above[offset]
+            else:
+                current[offset] = (tc, span)
+            root, root_span = current[offset]
+            cells.extend([root] * root_span)
+            offset += span
+        above = current
+
+        yield [_cell_text(tc) for tc in cells[:3]]
+
+
+@dataclass(slots=True)
+class TableDecision:
+    """Решение classify_table: анкета ли таблица и почему."""
+
+    questionnaire: bool
+    reason: str
+
+
+def _first_column_labels(tbl, limit: int) -> Iterator[str]:
+    """
+    Тексты первой ячейки первых limit строк w:tbl (как cells[0] в _iter_table_rows),
+    без чтения остальных ячеек.
+    """
+    above = None  # (смещение в сетке, подпись) первой ячейки предыдущей строки
+    for tr in tbl.iterchildren(W_TR):
+        if limit <= 0:
+            return
+        limit -= 1
+        tc = tr.find(W_TC)
+        if tc is None:
+            above = None
+            yield ""
+            continue
+        grid_before = tr.find(f"{{{W_NS}}}trPr/{{{W_NS}}}gridBefore")
+        offset = int(grid_before.get(W_VAL)) if grid_before is not None else 0
+        if _tc_property(tc, "vMerge") in ("", "continue") and above is not None and above[0] == offset:
+            label = above[1]
+        else:
+            label = _cell_text(tc)
+        above = (offset, label)
+        yield label
+
+
+def classify_table(tbl, rows: int = CLASSIFY_ROWS) -> TableDecision:
+    """
+    Быстро решает, может ли таблица быть анкетой, до извлечения текста ячеек.
+
+    Смотрит только подписи (первая колонка) первых rows строк: таблица
+    считается анкетой, если хоть одна подпись содержит синоним поля
+    профиля (те же правила, что у FieldMatcher). В анкете такие подписи
+    (ФИО, должность) идут первыми, поэтому на анкетах результат разбора
+    не меняется, а таблицы подписей и оформления отбрасываются сразу.
+
+    Args:
+        tbl: Элемент w:tbl (lxml; для python-docx - table._tbl)
+        rows: Сколько первых строк смотреть
+    """
+    labels = []
+    for number, label in enumerate(_first_column_labels(tbl, rows), 1):
+        nk = normalize(label)
+        for target, name in _QUESTIONNAIRE_LABELS:
+            if target in nk:
+                return TableDecision(True, f"строка {number}: подпись {label.strip()!r} - поле {name}")
+        labels.append(label.strip())
+    if not labels:
+        return TableDecision(False, "таблица без строк")
+    return TableDecision(False, f"в первых {len(labels)} строках нет подписей полей анкеты: {labels!r}")
+
+
+def _rejected(tbl) -> bool:
+    """Отбрасывает ли classify_table таблицу; отброшенные учитываются в метриках."""
+    with METRICS.stage("classify"):
+        if classify_table(tbl).questionnaire:
+            return False
+    METRICS.count("tables")
+    METRICS.count("tables_skipped")
+    METRICS.count("tables_rejected")
+    return True
+
+
+def _main_document_part(package: zipfile.ZipFile) -> str:
+    """Имя основной части документа (обычно word/document.xml)."""
+    try:
+        rels = etree.fromstring(package.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in rels.iterchildren(f"{{{REL_NS}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_REL:
+            return rel.get("Target").lstrip("/")
+    return "word/document.xml"
+
+
+def extract_tables_lxml(filepath: Union[Path, BinaryIO], classify: bool = True) -> Iterator[TableData]:
+    """
+    Извлекает данные таблиц напрямую из word/document.xml через lxml.iterparse.
+    
+    Не строит объектную модель python-docx: учитываются только таблицы
+    верхнего уровня (как Document.tables), а уже разобранные элементы
+    удаляются из дерева, чтобы память не росла с размером документа.
+    Результат совпадает с extract_tables_docx (в том числе при classify).
+    """
+    with METRICS.stage("load"):
+        package = zipfile.ZipFile(filepath)
+        part = _main_document_part(package)
+    with package:
+        with package.open(part) as xml:
+            events = etree.iterparse(xml, events=("end",), tag=W_TBL)
+            for _, tbl in METRICS.timed(events, "tables"):
+                parent = tbl.getparent()
+                # Вложенные таблицы разбираются в составе внешней
+                if parent is None or parent.tag != W_BODY:
+                    continue
+                if not (classify and _rejected(tbl)):
+                    with METRICS.stage("tables"):
+                        data, data_en = _rows_to_data(_iter_table_rows(tbl))
+                    yield tbl, data, data_en
+
+                tbl.clear()
+                while tbl.getprevious() is not None:
+                    del parent[0]
+
+
+TABLE_EXTRACTORS: Dict[str, Callable[..., Iterator[TableData]]] = {
+    "docx": extract_tables_docx,
+    "lxml": extract_tables_lxml,
+}
+
+
+def parse_profiles_from_docx(filepath: Union[Path, BinaryIO], backend: Optional[str] = None,
+                             classify: bool = True) -> List[Profile]:
     """
     Парсит все профили из документа.
     Каждая таблица обрабатывается как отдельная анкета.
     
+    Args:
+        filepath: Путь к docx файлу или файловый объект
+        backend: Способ извлечения таблиц: "docx" (python-docx) или
+                 "lxml" (быстрый разбор XML); по умолчанию DEFAULT_BACKEND
+        classify: Отбрасывать таблицы, не похожие на анкету, до чтения
+                  ячеек (см. classify_table)
+    
     Returns:
-        Список профилей, каждый в формате {"ru": {...}, "en": {...}}
+        Список профилей (Profile)
     """
-    doc = Document(filepath)
+    extract_tables = TABLE_EXTRACTORS[backend or DEFAULT_BACKEND]
     profiles = []
+    METRICS.count("files")
 
     # Обрабатываем каждую таблицу как отдельную анкету
-    for table in doc.tables:
-        data = {}
-        data_en = {}
-        
-        # Извлекаем данные из таблицы
-        for row in table.rows:
-            cells = row.cells
-            if len(cells) >= 2:
-                key = cells[0].text.strip()
-                value_ru = cells[1].text.strip()
-                value_en = cells[2].text.strip() if len(cells) >= 3 else ""
-                if key:
-                    data[key] = value_ru
-                    data_en[key] = value_en
-        
+    for table, data, data_en in extract_tables(filepath, classify=classify):
+        METRICS.count("tables")
         # Проверяем, есть ли в таблице хотя бы минимальные данные (например, ФИО)
         # Если таблица пустая или не содержит данных профиля, пропускаем её
         has_data = False
@@ -145,13 +485,192 @@ def parse_profiles_from_docx(filepath: Path) -> List[Dict[str, Dict[str, str]]]:
         
         if has_data:
             try:
-                profile = parse_table_to_profile(table, data, data_en)
+                with METRICS.stage("match"):
+                    profile = parse_table_to_profile(table, data, data_en)
                 # Проверяем, что профиль не пустой (есть хотя бы ФИО)
-                if profile["ru"]["ФИО, звание и место работы"] or profile["en"]["Name, position, affiliation"]:
+                if profile.ru.name_line or profile.en.name_line:
                     profiles.append(profile)
+                    continue
             except Exception as e:
                 # Пропускаем таблицы с ошибками
                 print(f"Ошибка при обработке таблицы: {e}")
+                METRICS.count("table_errors")
                 continue
+        METRICS.count("tables_skipped")
     
+    METRICS.count("profiles", len(profiles))
     return profiles
+
+
+def explain_tables(filepath: Union[Path, BinaryIO]) -> List[TableDecision]:
+    """
+    Решения classify_table для всех таблиц верхнего уровня документа,
+    в порядке таблиц (для отладки: почему анкета не найдена).
+    """
+    with zipfile.ZipFile(filepath) as package:
+        with package.open(_main_document_part(package)) as xml:
+            body = etree.parse(xml).getroot().find(W_BODY)
+    return [classify_table(tbl) for tbl in body.iterchildren(W_TBL)] if body is not None else []
+
+
+def preload_backend(backend: Optional[str] = None) -> None:
+    """
+    Импортирует библиотеки способа извлечения таблиц заранее (python-docx
+    импортируется при первом разборе, см. extract_tables_docx): перед fork
+    пула процессов или в долгоживущем процессе веб-приложения.
+    """
+    if (backend or DEFAULT_BACKEND) == "docx":
+        import docx  # noqa: F401
+
+
+def _parse_source(source: Union[Path, str, bytes], backend: Optional[str] = None,
+                  collect_metrics: bool = False) -> Tuple[List[Profile], Optional[str], Optional[Dict]]:
+    """
+    Парсит один источник, не пропуская исключения наружу.
+    Выполняется в дочернем процессе, поэтому определена на уровне модуля.
+    При collect_metrics возвращает метрики этого файла, чтобы
+    родительский процесс добавил их к своим (см. metrics.Metrics.merge).
+    Блокировка METRICS в дочернем процессе своя, созданная после fork
+    (см. metrics.py), поэтому reset() здесь не ждет потоков родителя.
+    """
+    if collect_metrics:
+        METRICS.enabled = True
+        METRICS.reset()
+    try:
+        if isinstance(source, bytes):
+            METRICS.count("bytes", len(source))
+            source = BytesIO(source)
+        elif METRICS.enabled:
+            METRICS.count("bytes", os.path.getsize(source))
+        result = parse_profiles_from_docx(source, backend=backend), None
+    except Exception as e:
+        METRICS.count("errors")
+        result = [], str(e)
+    return (*result, METRICS.snapshot() if collect_metrics else None)
+
+
+def iter_parse_many(sources: Iterable[DocxSource], workers: Optional[int] = None,
+                    backend: Optional[str] = None,
+                    executor: Optional[ExecutorFactory] = None) -> Iterator[Tuple[List[Profile], Optional[str]]]:
+    """
+    Парсит несколько документов параллельно в пуле процессов,
+    отдавая результат каждого файла, как только он готов (в порядке входа).
+    
+    Источники читаются по мере отправки в пул: одновременно в работе не
+    больше PARSE_WINDOW файлов на процесс, поэтому память не растет с
+    числом файлов (sources может быть генератором).
+    
+    Args:
+        sources: Пути к docx файлам, их содержимое (bytes) или файловые объекты
+        workers: Количество процессов (по умолчанию os.cpu_count());
+                 при workers=1 или одном файле разбор идет в текущем процессе
+        backend: Способ извлечения таблиц (см. parse_profiles_from_docx)
+        executor: Общий пул на workers процессов (см. ExecutorFactory; общий
+                  для запросов веб-приложения); без него пул создается на время вызова
+    
+    Yields:
+        Пары (профили, ошибка). Ошибка в одном файле не прерывает обработку
+        остальных: для такого файла отдается ([], текст ошибки). Если процесс
+        пула аварийно завершился (OOM, падение lxml), пул заменяется, ошибку
+        получают только файлы, которые в нем разбирались.
+    """
+    # Файловые объекты нельзя передать в другой процесс, читаем их содержимое
+    items = (s.read() if hasattr(s, "read") else s for s in sources)
+    workers = workers or os.cpu_count() or 1
+    # Пул не нужен (и fork дороже разбора), если файл всего один
+    head = list(islice(items, workers))
+    workers = min(workers, len(head))
+    items = chain(head, items)
+    if workers <= 1:
+        parse = partial(_parse_source, backend=backend)
+        for profiles, error, _ in map(parse, items):
+            yield profiles, error
+        return
+
+    if executor is not None:
+        yield from _iter_pool(executor, items, workers, backend)
+        return
+
+    # Импорт до создания пула: дочерние процессы (fork) получат модули готовыми
+    preload_backend(backend)
+    pool = None
+
+    def own_pool(broken: Optional[Executor]) -> Executor:
+        nonlocal pool
+        if pool is None or pool is broken:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            pool = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+    try:
+        yield from _iter_pool(own_pool, items, workers, backend)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def _iter_pool(get_executor: ExecutorFactory, items: Iterator[Union[Path, str, bytes]], workers: int,
+               backend: Optional[str]) -> Iterator[Tuple[List[Profile], Optional[str]]]:
+    """Разбор в пуле с окном из PARSE_WINDOW * workers файлов, в порядке входа."""
+    # Метрики дочерних процессов возвращаются вместе с результатом
+    parse = partial(_parse_source, backend=backend, collect_metrics=METRICS.enabled)
+    pending: "deque[Future]" = deque()
+    executor = get_executor(None)
+
+    def submit(item: Union[Path, str, bytes]) -> Future:
+        nonlocal executor
+        try:
+            return executor.submit(parse, item)
+        except BrokenProcessPool:
+            # Пул сломался до отправки файла: файл разбирается в новом пуле
+            executor = get_executor(executor)
+            return executor.submit(parse, item)
+
+    def result() -> Tuple[List[Profile], Optional[str]]:
+        try:
+            profiles, error, file_metrics = pending.popleft().result()
+        except BrokenProcessPool as e:
+            # Файл разбирался в пуле, процесс которого завершился аварийно
+            METRICS.count("errors")
+            return [], str(e)
+        METRICS.merge(file_metrics)
+        return profiles, error
+
+    try:
+        for item in items:
+            pending.append(submit(item))
+            if len(pending) >= PARSE_WINDOW * workers:
+                yield result()
+        while pending:
+            yield result()
+    finally:
+        # Разбор прерван (ошибка или клиент ушел): не занимаем общий пул
+        for future in pending:
+            future.cancel()
+
+
+def parse_many(sources: Iterable[DocxSource], workers: Optional[int] = None,
+               backend: Optional[str] = None,
+               progress: Optional[Callable[[int, int], None]] = None) -> List[Tuple[List[Profile], Optional[str]]]:
+    """
+    Парсит несколько документов параллельно (см. iter_parse_many).
+    
+    Args:
+        progress: Вызывается как progress(готово, всего) после каждого файла
+    
+    Returns:
+        Список пар (профили, ошибка) в порядке входных источников.
+    """
+    items = list(sources)
+    return collect_results(iter_parse_many(items, workers=workers, backend=backend), len(items), progress)
+
+
+def collect_results(results: Iterable, total: int, progress: Optional[Callable[[int, int], None]] = None) -> List:
+    """Собирает результаты по мере готовности, сообщая о прогрессе."""
+    collected = []
+    for result in results:
+        collected.append(result)
+        if progress:
+            progress(len(collected), total)
+    return collected
@@ -0,0 +1,137 @@
+"""
+Выгрузка разобранных профилей в JSONL, CSV и Parquet.
+
+Профили пишутся порциями по chunk_size, поэтому память не зависит от их
+общего числа: на вход можно подавать генератор (например, результаты
+iter_parse_many по мере разбора).
+"""
+import importlib.util
+import io
+import json
+from itertools import islice
+from typing import BinaryIO, Callable, Dict, Iterable, Iterator, List
+
+from models import EN_LABELS, RU_LABELS, Profile
+
+# Порция профилей, записываемая за один раз
+DEFAULT_CHUNK_SIZE = 1000
+
+# Колонки плоской таблицы (CSV, Parquet) - поля профиля в порядке вывода
+RU_COLUMNS = tuple(label for _, label in RU_LABELS)
+EN_COLUMNS = tuple(label for _, label in EN_LABELS)
+COLUMNS = RU_COLUMNS + EN_COLUMNS
+
+# Формат выгрузки -> MIME-тип ответа
+EXPORT_FORMATS = {
+    "jsonl": "application/x-ndjson",
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+# pyarrow - необязательная зависимость: без него недоступен только Parquet
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+
+
+def profile_row(profile: Profile) -> Dict[str, str]:
+    """Профиль в виде одной строки таблицы (колонки COLUMNS)."""
+    row = {label: getattr(profile.ru, attr) for attr, label in RU_LABELS}
+    row.update((label, getattr(profile.en, attr)) for attr, label in EN_LABELS)
+    return row
+
+
+def iter_chunks(items: Iterable, size: int) -> Iterator[List]:
+    """Разбивает поток на списки не длиннее size."""
+    iterator = iter(items)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def write_jsonl(profiles: Iterable[Profile], f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Пишет профили в формате {"ru": {...}, "en": {...}}, по одному JSON объекту в строке."""
+    count = 0
+    for chunk in iter_chunks(profiles, chunk_size):
+        f.write("".join(json.dumps(profile.to_dict(), ensure_ascii=False) + "\n" for profile in chunk).encode("utf-8"))
+        count += len(chunk)
+    return count
+
+
+def write_csv(profiles: Iterable[Profile], f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Пишет профили в CSV (UTF-8, заголовок - названия полей)."""
+    # pandas импортируется при первой выгрузке: консольной сборке HTML он не нужен
+    import pandas as pd
+
+    count = 0
+    text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+    try:
+        for chunk in iter_chunks(profiles, chunk_size):
+            frame = pd.DataFrame([profile_row(profile) for profile in chunk], columns=COLUMNS)
+            frame.to_csv(text, header=not count, index=False)
+            count += len(chunk)
+        if not count:
+            pd.DataFrame(columns=COLUMNS).to_csv(text, index=False)
+        text.flush()
+    finally:
+        # Файл остается открытым для вызывающего кода
+        text.detach()
+    return count
+
+
+def write_parquet(profiles: Iterable[Profile], f: BinaryIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Пишет профили в Parquet; каждая порция - отдельная группа строк.
+
+    Raises:
+        ImportError: если не установлен pyarrow
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Для выгрузки в Parquet установите pyarrow: pip install pyarrow") from e
+
+    schema = pa.schema([(column, pa.string()) for column in COLUMNS])
+    count = 0
+    with pq.ParquetWriter(f, schema) as writer:
+        for chunk in iter_chunks(profiles, chunk_size):
+            writer.write_table(pa.Table.from_pylist([profile_row(profile) for profile in chunk], schema=schema))
+            count += len(chunk)
+    return count
+
+
+def iter_jsonl(f: Iterable[str]) -> Iterator[Profile]:
+    """Читает профили, выгруженные write_jsonl (f - текстовый файл)."""
+    for line in f:
+        if line.strip():
+            yield Profile.from_dict(json.loads(line))
+
+
+WRITERS: Dict[str, Callable[[Iterable[Profile], BinaryIO, int], int]] = {
+    "jsonl": write_jsonl,
+    "csv": write_csv,
+    "parquet": write_parquet,
+}
+
+
+def export_profiles(profiles: Iterable[Profile], f: BinaryIO, fmt: str,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """
+    Выгружает профили в открытый на запись двоичный файл.
+
+    Args:
+        profiles: Профили (Profile)
+        f: Файл, открытый в режиме "wb"
+        fmt: "jsonl", "csv" или "parquet"
+        chunk_size: Сколько профилей держать в памяти одновременно
+
+    Raises:
+        ValueError: если формат не поддерживается
+
+    Returns:
+        Число выгруженных профилей
+    """
+    if fmt not in WRITERS:
+        raise ValueError(f"Неизвестный формат выгрузки: {fmt} (доступны: {', '.join(WRITERS)})")
+    return WRITERS[fmt](profiles, f, chunk_size)
@@ -0,0 +1,26 @@
+"""
+Настройки gunicorn (файл подхватывается автоматически из текущего каталога).
+
+С --preload (см. Procfile) приложение загружается в главном процессе и
+прогревается до запуска воркеров (app.warm_up): импорт python-docx, lxml
+и pandas, разбор встроенной анкеты и компиляция шаблонов выполняются один
+раз, а воркеры получают готовую память при fork. gc.freeze() переносит
+объекты главного процесса в постоянное поколение сборщика мусора, чтобы
+сборки в воркерах не трогали эти страницы и они оставались общими
+(copy-on-write).
+
+Без --preload каждый воркер загружает приложение сам, прогрева нет.
+Отключить прогрев при --preload: GUNICORN_WARMUP=false.
+"""
+import gc
+import os
+
+
+def on_starting(server):
+    # При --preload приложение уже импортировано (Arbiter.setup)
+    if not server.cfg.preload_app or os.environ.get('GUNICORN_WARMUP', 'true').lower() != 'true':
+        return
+    from app import warm_up
+
+    warm_up()
+    gc.freeze()
@@ -0,0 +1,175 @@
+"""
+Пакетная проверка и нормализация идентификаторов профилей (ORCID, Scopus ID,
+Researcher ID, SPIN, Email, сайт).
+
+Все профили пакета загружаются в один DataFrame, и каждая колонка
+обрабатывается векторными строковыми операциями pandas, без цикла Python
+по профилям: пакет из десятков тысяч анкет проверяется за один проход.
+Если установлен pyarrow, колонки хранятся в формате Arrow и регулярные
+выражения выполняются без интерпретатора (RE2); без него результат тот же.
+Поэтому в шаблонах цифры записаны как [0-9], а не \d (в re \d - любая цифра
+Unicode, в RE2 - только ASCII), а пробелы Unicode сначала заменяются обычными.
+"""
+from dataclasses import replace
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from models import RU_LABELS, Profile
+
+try:
+    import pyarrow  # noqa: F401
+    STRING_DTYPE = "string[pyarrow]"
+except ImportError:
+    STRING_DTYPE = "string"
+
+# Проверяемые поля ProfileRu в порядке вывода
+IDENTIFIER_FIELDS = ("orcid", "scopus", "researcher", "spin", "email", "website")
+
+# Подписи полей для сообщений
+FIELD_LABELS: Dict[str, str] = {attr: label for attr, label in RU_LABELS if attr in IDENTIFIER_FIELDS}
+
+ORCID_PATTERN = r"([0-9]{4})[-\s]?([0-9]{4})[-\s]?([0-9]{4})[-\s]?([0-9]{3}[0-9X])"
+RESEARCHER_PATTERN = r"[A-Z]{1,3}-[0-9]{4}-[0-9]{4}"
+EMAIL_PATTERN = r"[^@\s,;]+@[^@\s,;]+\.[^@\s,;]+"
+URL_PATTERN = r"https?://[^\s/?#]+\.[^\s/?#]+(?:[/?#]\S*)?"
+# Адрес без схемы: example.org/page, www.example.org
+DOMAIN_PATTERN = r"(?:[^\s/?#.@:]+\.)+[a-zA-Zа-яА-ЯёЁ]{2,}(?:[/?#]\S*)?"
+# Пробельные символы, которые \s находит в re, но не в RE2 (неразрывный пробел и др.)
+_UNICODE_SPACES = "[" + "".join(ch for ch in map(chr, range(0x3001)) if ch.isspace() and ch not in " \t\n\r\f") + "]"
+# Веса цифр ORCID в контрольной сумме ISO 7064 MOD 11-2: 2^15 ... 2^1
+_ORCID_WEIGHTS = 2 ** np.arange(15, 0, -1, dtype=np.int64)
+
+
+def identifier_frame(profiles: Iterable[Profile]) -> pd.DataFrame:
+    """Значения IDENTIFIER_FIELDS всех профилей: строка на профиль."""
+    profiles = list(profiles)
+    return pd.DataFrame(
+        {attr: [getattr(profile.ru, attr) for profile in profiles] for attr in IDENTIFIER_FIELDS},
+        columns=list(IDENTIFIER_FIELDS),
+        dtype=STRING_DTYPE,
+    )
+
+
+def orcid_checksum_ok(orcid: pd.Series) -> pd.Series:
+    """
+    Проверка контрольной цифры ORCID вида 0000-0002-1825-0097 (ISO 7064 MOD 11-2).
+    Значения другого вида считаются некорректными.
+    """
+    result = pd.Series(False, index=orcid.index)
+    shaped = orcid.str.fullmatch(r"[0-9]{4}-[0-9]{4}-[0-9]{4}-[0-9]{3}[0-9X]").fillna(False).astype(bool)
+    if not shaped.any():
+        return result
+    compact = orcid[shaped].str.replace("-", "", regex=False)
+    # 16 символов на значение -> матрица цифр n x 15 и контрольный символ
+    codes = np.frombuffer("".join(compact).encode("ascii"), dtype=np.uint8).reshape(-1, 16)
+    digits = codes[:, :15].astype(np.int64) - ord("0")
+    check = (12 - (digits @ _ORCID_WEIGHTS) % 11) % 11
+    expected = np.where(check == 10, ord("X"), check + ord("0"))
+    result[shaped] = expected == codes[:, 15]
+    return result
+
+
+def normalize_identifiers(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Нормализованные значения (та же форма, что у identifier_frame).
+
+    Убираются пробелы по краям, префиксы-ссылки (https://orcid.org/,
+    адрес профиля Scopus, publons), mailto:; ORCID и Researcher ID
+    приводятся к каноническому виду, к адресу сайта без схемы
+    добавляется https://. Значение, которое не удалось разобрать,
+    остается как было (без пробелов по краям, пробелы Unicode - обычные).
+    """
+    values = frame.astype(STRING_DTYPE).fillna("").apply(
+        lambda column: column.str.replace(_UNICODE_SPACES, " ", regex=True).str.strip()
+    )
+    result = pd.DataFrame(index=values.index)
+
+    # str.replace вместо str.extract: для pyarrow-колонок он векторный,
+    # а значения без совпадения остаются как были
+    result["orcid"] = values["orcid"].str.upper().str.replace(
+        rf"^.*?{ORCID_PATTERN}.*$", r"\1-\2-\3-\4", regex=True
+    )
+
+    result["scopus"] = (
+        values["scopus"]
+        .str.replace(r"^.*authorId=([0-9]+).*$", r"\1", regex=True)
+        .str.replace(r"\s+", "", regex=True)
+    )
+
+    researcher = values["researcher"].str.upper().str.replace(r"\s+", "", regex=True)
+    result["researcher"] = researcher.str.replace(rf"^.*?({RESEARCHER_PATTERN}).*$", r"\1", regex=True).where(
+        researcher.str.contains(RESEARCHER_PATTERN), values["researcher"]
+    )
+
+    result["spin"] = (
+        values["spin"]
+        .str.replace(r"(?i)^spin(?:[-\s]*(?:код|code))?\s*:?\s*", "", regex=True)
+        .str.replace(r"\s+", "", regex=True)
+    )
+
+    result["email"] = values["email"].str.replace(r"(?i)^mailto:\s*", "", regex=True)
+
+    website = values["website"]
+    bare = website.str.fullmatch(DOMAIN_PATTERN).fillna(False).astype(bool)
+    result["website"] = website.where(~bare, "https://" + website)
+
+    return result[list(IDENTIFIER_FIELDS)]
+
+
+def identifier_flags(normalized: pd.DataFrame) -> pd.DataFrame:
+    """
+    Флаги проверки по нормализованным значениям: колонка на поле
+    (True - значение корректно или не заполнено) и общая колонка valid.
+    """
+    empty = normalized.isin(["", "-"])
+    checks = {
+        "orcid": orcid_checksum_ok(normalized["orcid"]),
+        "scopus": normalized["scopus"].str.fullmatch(r"[0-9]+"),
+        "researcher": normalized["researcher"].str.fullmatch(RESEARCHER_PATTERN),
+        "spin": normalized["spin"].str.fullmatch(r"[0-9]+(?:-[0-9]+)?"),
+        "email": normalized["email"].str.fullmatch(EMAIL_PATTERN),
+        "website": normalized["website"].str.fullmatch(URL_PATTERN),
+    }
+    flags = pd.DataFrame(
+        {attr: checks[attr].fillna(False).astype(bool) | empty[attr] for attr in IDENTIFIER_FIELDS},
+        index=normalized.index,
+    )
+    flags["valid"] = flags.all(axis=1)
+    return flags
+
+
+def check_identifiers(profiles: Iterable[Profile]) -> Tuple[List[Profile], pd.DataFrame]:
+    """
+    Нормализует и проверяет идентификаторы всех профилей за один проход.
+
+    Профили с измененными значениями заменяются копиями (исходные могут
+    быть общими с кэшем разбора и не изменяются).
+
+    Returns:
+        (профили в том же порядке, флаги - строка на профиль, см. identifier_flags)
+    """
+    profiles = list(profiles)
+    frame = identifier_frame(profiles)
+    normalized = normalize_identifiers(frame)
+    flags = identifier_flags(normalized)
+
+    changed = (normalized != frame.fillna("")).any(axis=1).to_numpy(dtype=bool)
+    if changed.any():
+        rows = zip(*(normalized[attr][changed].tolist() for attr in IDENTIFIER_FIELDS))
+        for idx, values in zip(np.flatnonzero(changed), rows):
+            profile = profiles[idx]
+            profiles[idx] = Profile(replace(profile.ru, **dict(zip(IDENTIFIER_FIELDS, values))), profile.en)
+    return profiles, flags
+
+
+def normalize_profiles(profiles: Iterable[Profile]) -> List[Profile]:
+    """Профили с нормализованными идентификаторами (см. check_identifiers), со сводкой некорректных."""
+    profiles, flags = check_identifiers(profiles)
+    invalid = (~flags[list(IDENTIFIER_FIELDS)]).sum()
+    invalid = invalid[invalid > 0]
+    if not invalid.empty:
+        counts = ", ".join(f"{FIELD_LABELS[attr]} - {count}" for attr, count in invalid.items())
+        print(f"Некорректные идентификаторы (профилей: {int((~flags['valid']).sum())} из {len(profiles)}): {counts}")
+    return profiles
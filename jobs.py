@@ -0,0 +1,133 @@
+"""
+Фоновая обработка архивов: очередь задач с опросом статуса и результата.
+"""
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+_JOB_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobManager:
+    """
+    Очередь задач на локальном пуле потоков, без внешнего брокера.
+
+    Состояние каждой задачи хранится в отдельном каталоге (status.json,
+    входные файлы и результат), поэтому статус задачи, запущенной в одном
+    воркере gunicorn, может отдать любой другой воркер. Каталоги задач
+    старше ttl секунд удаляются.
+    """
+
+    def __init__(self, directory: Path, max_workers: int = 2, ttl: int = 3600):
+        """
+        Args:
+            directory: Каталог для хранения задач
+            max_workers: Сколько задач выполняется одновременно
+            ttl: Время хранения задачи и ее результата, в секундах
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+
+    def create(self) -> str:
+        """Создает пустую задачу и возвращает ее id; входные файлы кладутся в job_dir(id)."""
+        self.expire()
+        job_id = uuid.uuid4().hex
+        self.job_dir(job_id).mkdir()
+        self._write_status(job_id, {
+            "id": job_id,
+            "status": "queued",
+            "done": 0,
+            "total": 0,
+            "error": None,
+            "created": time.time(),
+        })
+        return job_id
+
+    def submit(self, job_id: str, func: Callable[..., Any], *args: Any) -> None:
+        """
+        Ставит задачу в очередь.
+
+        func вызывается как func(progress, *args), где progress(готово, всего)
+        обновляет прогресс задачи. Результат func (словарь строк) сохраняется
+        как файлы result_<ключ> в каталоге задачи.
+        """
+        self._executor.submit(self._run, job_id, func, *args)
+
+    def job_dir(self, job_id: str) -> Path:
+        """Каталог задачи."""
+        return self.directory / job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Статус задачи или None, если задачи нет (или id некорректен)."""
+        if not _JOB_ID_RE.match(job_id):
+            return None
+        try:
+            with open(self.job_dir(job_id) / "status.json", "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def result(self, job_id: str, name: str) -> Optional[str]:
+        """Часть результата завершенной задачи."""
+        try:
+            return self.result_path(job_id, name).read_text(encoding="utf-8")
+        except OSError:
+            return None
+
+    def result_path(self, job_id: str, name: str) -> Path:
+        """Путь к части результата (для чтения по частям)."""
+        return self.job_dir(job_id) / f"result_{name}"
+
+    def expire(self) -> None:
+        """
+        Удаляет задачи, не обновлявшиеся дольше ttl.
+        Каталог выполняющейся задачи обновляется при каждой записи статуса.
+        """
+        deadline = time.time() - self.ttl
+        for job_dir in self.directory.iterdir():
+            try:
+                if job_dir.stat().st_mtime < deadline:
+                    shutil.rmtree(job_dir, ignore_errors=True)
+            except OSError:
+                continue
+
+    def _run(self, job_id: str, func: Callable[..., Any], *args: Any) -> None:
+        self._update(job_id, status="running")
+
+        def progress(done: int, total: int) -> None:
+            self._update(job_id, done=done, total=total)
+
+        try:
+            result = func(progress, *args)
+            for name, content in result.items():
+                self.result_path(job_id, name).write_text(content, encoding="utf-8")
+            self._update(job_id, status="done")
+        except Exception as e:
+            print(f"Ошибка в задаче {job_id}: {e}")
+            self._update(job_id, status="error", error=str(e))
+
+    def _update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            status = self.status(job_id)
+            if status is None:
+                return
+            status.update(fields)
+            self._write_status(job_id, status)
+
+    def _write_status(self, job_id: str, status: Dict[str, Any]) -> None:
+        # Атомарная запись, чтобы опрос из другого воркера не прочитал половину файла
+        fd, tmp_path = tempfile.mkstemp(dir=self.job_dir(job_id), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(status, f)
+        os.replace(tmp_path, self.job_dir(job_id) / "status.json")
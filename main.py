@@ -1,132 +1,190 @@
-from editor_parser import parse_profiles_from_docx
+from dedupe import dedupe_profiles
+from editor_parser import iter_parse_many, parse_many
+from export import EXPORT_FORMATS, export_profiles
+from metrics import METRICS
+from renderer import english_lines, render_profiles
+from functools import partial
 from pathlib import Path
-import html
+import argparse
+import os
+import tempfile
 from typing import Optional
 
 
-def field(label: str, value: str) -> Optional[str]:
-    if value and value.strip() and value.strip() != "-":
-        return value
-    return None
-
-
-def make_profile_html(profile: dict) -> str:
-    html_block = []
-
-    # ФИО жирным, остальное обычным
-    full_line = profile["ФИО, звание и место работы"]
-    parts = full_line.split(",", 1)
-    if len(parts) == 2:
-        fio = html.escape(parts[0].strip())
-        rest = html.escape(parts[1].strip())
-        html_block.append(f'<p style="padding-left: 40px;"><strong>{fio}</strong>, {rest}</p>')
-    else:
-        html_block.append(f'<p style="padding-left: 40px;"><strong>{html.escape(full_line)}</strong></p>')
-
-    if field("Специализация", profile["Специализация"]):
-        html_block.append(f'<p style="padding-left: 80px;"><strong>Специализация:&nbsp;</strong>{html.escape(profile["Специализация"])}</p>')
-
-    if field("Сайт", profile["Сайт"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>Адрес личной страницы в интернете URL: </strong>'
-            f'<a href="{html.escape(profile["Сайт"])}" target="_blank" rel="noopener">{html.escape(profile["Сайт"])}</a></p>'
-        )
-
-    if field("Email", profile["Email"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>E-mail:</strong> '
-            f'<a href="mailto:{html.escape(profile["Email"])} "target="_blank" rel="noopener">{html.escape(profile["Email"])}</a></p>'
-        )
-
-    if field("SPIN", profile["SPIN"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>eLibrary SPIN-код: </strong>{html.escape(profile["SPIN"])}</p>'
-        )
-
-    if field("Scopus ID", profile["Scopus ID"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>SCOPUS Author ID: </strong>'
-           f'<a href="https://www.scopus.com/authid/detail.uri?authorId={html.escape(profile["Scopus ID"])}" target="_blank" rel="noopener">{html.escape(profile["Scopus ID"])}</a></p>'
-        )
-
-    if field("Researcher ID", profile["Researcher ID"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>Researcher ID: </strong>'
-            f'<a href="https://publons.com/researcher/{html.escape(profile["Researcher ID"])}" target="_blank" rel="noopener">{html.escape(profile["Researcher ID"])}</a></p>'
-        )
-
-    if field("ORCID", profile["ORCID"]):
-        html_block.append(
-            f'<p style="padding-left: 80px;"><strong>ORCID: </strong>'
-            f'<a href="https://orcid.org/{html.escape(profile["ORCID"])}" target="_blank" rel="noopener">{html.escape(profile["ORCID"])}</a></p>'
-        )
-
-    return "\n".join(html_block)
-
-
-def main():
+def replace_file(tmp_path: str, path: Path) -> None:
+    """
+    Переименовывает временный файл в path. mkstemp создает файл с правами
+    0600, поэтому права берутся у заменяемого файла, а для нового - как
+    у open() (0666 без umask): веб-сервер от другого пользователя должен
+    читать output/.
+    """
+    try:
+        mode = os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        mode = 0o666 & ~umask
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, path)
+
+
+def write_text_atomic(path: Path, text: str) -> None:
+    """
+    Записывает файл через временный файл и переименование,
+    чтобы сайт никогда не отдал наполовину записанный HTML.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(text)
+        replace_file(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+
+def main(workers: Optional[int] = None, backend: Optional[str] = None, profile: bool = False,
+         incremental: bool = False, dedupe: bool = False, normalize_ids: bool = False):
+    if profile:
+        METRICS.enabled = True
+        METRICS.reset()
     input_dir = Path("profiles")
     output_dir = Path("output")
     output_dir.mkdir(exist_ok=True)
 
-    profiles_html = []
-    english_lines = []
-    english_html = []
-    
     # Собираем все профили из всех файлов
     all_profiles = []
-    for docx_file in input_dir.glob("*.docx"):
+    docx_files = list(input_dir.glob("*.docx"))
+    if incremental:
+        from manifest import MANIFEST_NAME, BuildManifest
+
+        # Разбираем только новые и измененные файлы, остальное берем из манифеста
+        manifest = BuildManifest(output_dir / MANIFEST_NAME)
+        results = manifest.update(docx_files, workers=workers, backend=backend)
+        manifest.save()
+        print(f"Изменено файлов: {len(manifest.parsed)} из {len(docx_files)}")
+    else:
+        results = parse_many(docx_files, workers=workers, backend=backend)
+    for docx_file, (profiles, error) in zip(docx_files, results):
         print(f"Обработка: {docx_file.name}")
-        profiles = parse_profiles_from_docx(docx_file)
+        if error:
+            print(f"  Ошибка: {error}")
+            continue
         print(f"  Найдено анкет: {len(profiles)}")
         all_profiles.extend(profiles)
+
+    # ORCID, Scopus, SPIN, email и сайт приводятся к единому виду одним пакетом
+    if normalize_ids:
+        # pandas импортируется только с этим флагом (см. benchmarks/startup.py)
+        from identifiers import normalize_profiles
+
+        with METRICS.stage("identifiers"):
+            all_profiles = normalize_profiles(all_profiles)
+
+    # Один редактор в анкетах нескольких журналов выводится один раз
+    if dedupe:
+        all_profiles = dedupe_profiles(all_profiles)
     
-    # Обрабатываем каждый профиль с разделителями
-    for idx, profile in enumerate(all_profiles):
-        profiles_html.append(make_profile_html(profile["ru"]))
-        
-        # Добавляем перенос строки между профилями (кроме последнего)
-        if idx < len(all_profiles) - 1:
-            profiles_html.append('<br>')
-
-        if profile["en"]["Name, position, affiliation"]:
-            english_lines.append(profile["en"]["Name, position, affiliation"])
-
-            # HTML блок на английском
-            line = profile["en"]["Name, position, affiliation"]
-            parts = line.split(",", 1)
-            if len(parts) == 2:
-                fio = html.escape(parts[0].strip())
-                rest = html.escape(parts[1].strip())
-                english_html.append(f'<p style="padding-left: 40px;"><strong>{fio}</strong>, {rest}</p>')
-            else:
-                english_html.append(f'<p style="padding-left: 40px;"><strong>{html.escape(line)}</strong></p>')
-
-            if profile["en"].get("Keywords"):
-                english_html.append(
-                    f'<p style="padding-left: 80px;"><strong>Keywords:&nbsp;</strong>{html.escape(profile["en"]["Keywords"])}</p>'
-                )
-        
-        # Добавляем перенос строки в английской версии (кроме последнего)
-        if idx < len(all_profiles) - 1:
-            english_html.append('<br>')
+    # HTML профилей с разделителями
+    with METRICS.stage("render"):
+        html_output, english_html_output = render_profiles(all_profiles)
 
     # Сохраняем HTML на русском
-    html_output = ''.join(profiles_html)
-    with open(output_dir / "editor_profiles.html", "w", encoding="utf-8") as f:
-        f.write(html_output.strip())
+    write_text_atomic(output_dir / "editor_profiles.html", html_output)
 
     # Сохраняем английский текстовый файл
-    with open(output_dir / "editor_profiles_en.txt", "w", encoding="utf-8") as f:
-        f.write("\n".join(english_lines))
+    write_text_atomic(output_dir / "editor_profiles_en.txt", "\n".join(english_lines(all_profiles)))
 
     # HTML на английском
-    english_html_output = ''.join(english_html)
-    with open(output_dir / "editor_profiles_en.html", "w", encoding="utf-8") as f:
-        f.write(english_html_output.strip())
+    write_text_atomic(output_dir / "editor_profiles_en.html", english_html_output)
 
     print("\n✅ Все HTML-файлы успешно созданы!")
 
+    if profile:
+        print()
+        print(METRICS.summary())
+
+
+def export(export_format: str, output: Optional[Path] = None,
+           workers: Optional[int] = None, backend: Optional[str] = None,
+           dedupe: bool = False, normalize_ids: bool = False) -> Path:
+    """
+    Выгружает профили из папки profiles/ в JSONL, CSV или Parquet.
+    Профили пишутся по мере разбора файлов, порциями (см. export.py);
+    с dedupe или normalize_ids все профили сначала собираются в один пакет.
+    """
+    input_dir = Path("profiles")
+    output = Path(output or Path("output") / f"editor_profiles.{export_format}")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    docx_files = list(input_dir.glob("*.docx"))
+
+    def profiles():
+        for docx_file, (file_profiles, error) in zip(docx_files, iter_parse_many(docx_files, workers=workers, backend=backend)):
+            print(f"Обработка: {docx_file.name}")
+            if error:
+                print(f"  Ошибка: {error}")
+                continue
+            print(f"  Найдено анкет: {len(file_profiles)}")
+            yield from file_profiles
+
+    # Как и HTML, файл появляется под своим именем только целиком
+    fd, tmp_path = tempfile.mkstemp(dir=output.parent, prefix=output.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            batch = profiles()
+            if normalize_ids:
+                from identifiers import normalize_profiles
+
+                batch = normalize_profiles(batch)
+            if dedupe:
+                batch = dedupe_profiles(batch)
+            count = export_profiles(batch, f, export_format)
+        replace_file(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+
+    print(f"\n✅ Выгружено анкет: {count} -> {output}")
+    return output
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Генерация HTML из анкет в папке profiles/")
+    parser.add_argument("command", nargs="?", choices=["build", "export"], default="build",
+                        help="build - HTML и текстовый список (по умолчанию), "
+                             "export - выгрузка профилей в JSONL, CSV или Parquet")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Количество процессов для парсинга (по умолчанию - число ядер)")
+    parser.add_argument("--backend", choices=["docx", "lxml"], default=None,
+                        help="Способ чтения таблиц: python-docx или быстрый разбор XML через lxml")
+    parser.add_argument("--profile", action="store_true",
+                        help="Вывести время этапов обработки и счетчики")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Разбирать только новые и измененные файлы (манифест в output/)")
+    parser.add_argument("--watch", action="store_true",
+                        help="Следить за папкой profiles/ и пересобирать результаты при изменениях "
+                             "(включает --incremental; с пакетом watchdog - через inotify)")
+    parser.add_argument("--debounce", type=float, default=1.0,
+                        help="Сколько секунд ждать окончания серии изменений в режиме --watch")
+    parser.add_argument("--format", choices=list(EXPORT_FORMATS), default="jsonl",
+                        help="Формат для export (parquet требует пакет pyarrow)")
+    parser.add_argument("-o", "--output", type=Path, default=None,
+                        help="Файл для export (по умолчанию output/editor_profiles.<формат>)")
+    parser.add_argument("--dedupe", action="store_true",
+                        help="Объединять повторяющиеся профили (по ORCID, Scopus, Researcher ID, SPIN, email и ФИО)")
+    parser.add_argument("--normalize-ids", action="store_true",
+                        help="Нормализовать и проверить ORCID, Scopus ID, Researcher ID, SPIN, email и сайт")
+    args = parser.parse_args()
+    if args.command == "export":
+        export(args.format, args.output, workers=args.workers, backend=args.backend, dedupe=args.dedupe,
+               normalize_ids=args.normalize_ids)
+    else:
+        build = partial(main, workers=args.workers, backend=args.backend, profile=args.profile,
+                        incremental=args.incremental or args.watch, dedupe=args.dedupe,
+                        normalize_ids=args.normalize_ids)
+        build()
+        if args.watch:
+            from watcher import watch
+
+            print("\nОжидание изменений в profiles/ (Ctrl+C - выход)")
+            watch(Path("profiles"), build, debounce=args.debounce)
@@ -0,0 +1,119 @@
+"""
+Манифест сборки для инкрементального режима main.py.
+
+Для каждого исходного docx хранит mtime, размер, хэш содержимого и
+разобранные из него профили, чтобы при следующем запуске разбирать
+только новые и измененные файлы.
+"""
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from editor_parser import PARSER_VERSION, parse_many
+from models import Profile
+from parse_cache import ParseCache
+
+MANIFEST_NAME = ".manifest.json"
+
+Profiles = List[Profile]
+
+
+class BuildManifest:
+    """
+    Манифест в каталоге output/.
+
+    Файл считается неизмененным, если совпадают mtime и размер; если они
+    изменились, сравнивается хэш (ParseCache.key), так что простое
+    копирование или touch не вызывает повторного разбора. Смена
+    PARSER_VERSION сбрасывает манифест целиком.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.files: Dict[str, Dict[str, Any]] = {}
+        # Имена файлов, разобранных при последнем update()
+        self.parsed: List[str] = []
+        self.load()
+
+    def load(self) -> None:
+        """Читает манифест; поврежденный или устаревший манифест игнорируется."""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("parser_version") != PARSER_VERSION:
+            return
+        try:
+            self.files = {
+                name: dict(entry, profiles=[Profile.from_dict(profile) for profile in entry["profiles"]])
+                for name, entry in data.get("files", {}).items()
+            }
+        except (AttributeError, KeyError, TypeError):
+            self.files = {}
+
+    def save(self) -> None:
+        """Атомарно записывает манифест (временный файл + переименование)."""
+        files = {
+            name: dict(entry, profiles=[profile.to_dict() for profile in entry["profiles"]])
+            for name, entry in self.files.items()
+        }
+        fd, tmp_path = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"parser_version": PARSER_VERSION, "files": files}, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+    def update(self, docx_files: List[Path], workers: Optional[int] = None,
+               backend: Optional[str] = None) -> List[Tuple[Profiles, Optional[str]]]:
+        """
+        Приводит манифест к текущему набору файлов.
+
+        Разбирает только новые и измененные файлы, удаляет записи
+        исчезнувших. Файлы с ошибками в манифест не попадают и разбираются
+        при каждом запуске.
+
+        Returns:
+            Пары (профили, ошибка) в порядке docx_files, как у parse_many.
+        """
+        results: Dict[str, Tuple[Profiles, Optional[str]]] = {}
+        changed = []
+        for docx_file in docx_files:
+            stat = docx_file.stat()
+            entry = self.files.get(docx_file.name)
+            if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+                results[docx_file.name] = entry["profiles"], None
+                continue
+
+            blob = docx_file.read_bytes()
+            key = ParseCache.key(blob)
+            if entry and entry["hash"] == key:
+                entry.update(mtime=stat.st_mtime, size=stat.st_size)
+                results[docx_file.name] = entry["profiles"], None
+                continue
+            changed.append((docx_file.name, stat, key, blob))
+
+        self.parsed = [name for name, _, _, _ in changed]
+        parsed = parse_many([blob for _, _, _, blob in changed], workers=workers, backend=backend)
+        for (name, stat, key, _), (profiles, error) in zip(changed, parsed):
+            results[name] = profiles, error
+            if error:
+                self.files.pop(name, None)
+                continue
+            self.files[name] = {
+                "mtime": stat.st_mtime,
+                "size": stat.st_size,
+                "hash": key,
+                "profiles": profiles,
+            }
+
+        # Профили удаленных файлов больше не выводятся
+        for name in set(self.files) - set(results):
+            del self.files[name]
+
+        return [results[docx_file.name] for docx_file in docx_files]
@@ -0,0 +1,192 @@
+"""
+Метрики обработки: время по этапам и счетчики (файлы, таблицы, байты, ошибки).
+
+Сбор выключен по умолчанию; в выключенном состоянии stage() возвращает
+общий пустой контекстный менеджер, а count() сразу выходит, поэтому
+накладные расходы - один вызов метода.
+"""
+import os
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+_NULL_STAGE = nullcontext()
+
+# Описания счетчиков для /metrics
+COUNTER_HELP = {
+    "files": "Разобрано docx файлов",
+    "bytes": "Прочитано байт docx",
+    "tables": "Просмотрено таблиц",
+    "tables_skipped": "Пропущено таблиц без анкеты",
+    "tables_rejected": "Отброшено таблиц по подписям первых строк",
+    "profiles": "Найдено профилей",
+    "errors": "Файлов с ошибками",
+    "table_errors": "Таблиц с ошибками",
+    "jobs": "Обработано архивов",
+    "artifacts_reused": "Архивов, результат которых взят из готовых",
+    "pool_restarts": "Пересозданий пула процессов после аварийного завершения процесса",
+}
+
+
+class _Stage:
+    """Замер одного этапа; время добавляется при выходе из блока with."""
+
+    __slots__ = ("_metrics", "_name", "_started")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self) -> None:
+        self._started = time.perf_counter()
+
+    def __exit__(self, *exc: Any) -> None:
+        self._metrics.add_time(self._name, time.perf_counter() - self._started)
+
+
+class Metrics:
+    """
+    Накопитель метрик.
+
+    Внутри блока job() все, что записывается в текущем потоке, попадает
+    и в общие метрики, и в отдельный экземпляр для этой задачи.
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.durations: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def reset(self) -> None:
+        """Обнуляет все значения."""
+        with self._lock:
+            self.durations: Dict[str, float] = defaultdict(float)
+            self.calls: Dict[str, int] = defaultdict(int)
+            self.counters: Dict[str, int] = defaultdict(int)
+
+    def stage(self, name: str):
+        """Контекстный менеджер, замеряющий время этапа name."""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def timed(self, iterable: Iterable, name: str) -> Iterable:
+        """Итератор, время получения каждого элемента которого относится к этапу name."""
+        if not self.enabled:
+            return iterable
+        return self._timed(iter(iterable), name)
+
+    def _timed(self, iterator: Iterator, name: str) -> Iterator:
+        while True:
+            started = time.perf_counter()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                return
+            finally:
+                self.add_time(name, time.perf_counter() - started)
+            yield item
+
+    def count(self, name: str, value: int = 1) -> None:
+        """Увеличивает счетчик name."""
+        if not self.enabled:
+            return
+        for target in self._targets():
+            with target._lock:
+                target.counters[name] += value
+
+    def add_time(self, name: str, seconds: float, calls: int = 1) -> None:
+        """Добавляет время к этапу name."""
+        for target in self._targets():
+            with target._lock:
+                target.durations[name] += seconds
+                target.calls[name] += calls
+
+    @contextmanager
+    def job(self) -> Iterator["Metrics"]:
+        """Собирает метрики одной задачи (архива) в отдельный экземпляр."""
+        job_metrics = Metrics(enabled=self.enabled)
+        jobs = self._local.__dict__.setdefault("jobs", [])
+        jobs.append(job_metrics)
+        try:
+            yield job_metrics
+        finally:
+            jobs.remove(job_metrics)
+
+    def _targets(self) -> List["Metrics"]:
+        return [self] + getattr(self._local, "jobs", [])
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Копия всех значений (сериализуется в JSON)."""
+        with self._lock:
+            return {
+                "durations": dict(self.durations),
+                "calls": dict(self.calls),
+                "counters": dict(self.counters),
+            }
+
+    def merge(self, snapshot: Optional[Dict[str, Dict[str, Any]]]) -> None:
+        """Добавляет значения, собранные в другом процессе (см. snapshot)."""
+        if not snapshot:
+            return
+        for name, seconds in snapshot["durations"].items():
+            self.add_time(name, seconds, calls=snapshot["calls"].get(name, 0))
+        for name, value in snapshot["counters"].items():
+            self.count(name, value)
+
+    def prometheus(self, prefix: str = "editor_parser", gauges: Optional[Dict[str, float]] = None) -> str:
+        """Метрики в текстовом формате Prometheus."""
+        data = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_stage_seconds_total Суммарное время этапа обработки",
+            f"# TYPE {prefix}_stage_seconds_total counter",
+        ]
+        for name, seconds in sorted(data["durations"].items()):
+            lines.append(f'{prefix}_stage_seconds_total{{stage="{name}"}} {seconds:.6f}')
+        lines += [
+            f"# HELP {prefix}_stage_calls_total Число выполнений этапа",
+            f"# TYPE {prefix}_stage_calls_total counter",
+        ]
+        for name, calls in sorted(data["calls"].items()):
+            lines.append(f'{prefix}_stage_calls_total{{stage="{name}"}} {calls}')
+        for name in sorted(set(COUNTER_HELP) | set(data["counters"])):
+            lines += [
+                f"# HELP {prefix}_{name}_total {COUNTER_HELP.get(name, name)}",
+                f"# TYPE {prefix}_{name}_total counter",
+                f"{prefix}_{name}_total {data['counters'].get(name, 0)}",
+            ]
+        for name, value in sorted((gauges or {}).items()):
+            lines += [
+                f"# TYPE {prefix}_{name} gauge",
+                f"{prefix}_{name} {value}",
+            ]
+        return "\n".join(lines) + "\n"
+
+    def summary(self) -> str:
+        """Краткая сводка для консоли."""
+        data = self.snapshot()
+        lines = ["Этап                  Время, с   Вызовов"]
+        for name, seconds in sorted(data["durations"].items(), key=lambda item: -item[1]):
+            lines.append(f"{name:<20} {seconds:10.4f} {data['calls'][name]:9d}")
+        counters = ", ".join(f"{name}={value}" for name, value in sorted(data["counters"].items()))
+        if counters:
+            lines.append(f"Счетчики: {counters}")
+        return "\n".join(lines)
+
+
+# Общий экземпляр для парсера, веб-приложения и консольного режима
+METRICS = Metrics()
+
+# В дочернем процессе (fork пула разбора) метрики начинаются заново с новой
+# блокировкой: унаследованную мог держать другой поток родителя (задачи,
+# запросы), и в дочернем процессе ее уже никто не отпустит
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=METRICS._init_state)
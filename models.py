@@ -0,0 +1,79 @@
+"""
+Модель профиля члена редколлегии.
+
+Профиль хранится в объектах со __slots__ вместо пары словарей с длинными
+ключами: так меньше памяти на профиль и нет хэширования ключей при доступе.
+to_dict() / from_dict() переводят в прежний формат {"ru": {...}, "en": {...}}
+(JSON API, кэш на диске, выгрузки).
+"""
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+# Атрибут -> ключ в прежнем словарном формате, в порядке вывода
+RU_LABELS: Tuple[Tuple[str, str], ...] = (
+    ("name_line", "ФИО, звание и место работы"),
+    ("specialization", "Специализация"),
+    ("website", "Сайт"),
+    ("email", "Email"),
+    ("spin", "SPIN"),
+    ("scopus", "Scopus ID"),
+    ("researcher", "Researcher ID"),
+    ("orcid", "ORCID"),
+)
+
+EN_LABELS: Tuple[Tuple[str, str], ...] = (
+    ("name_line", "Name, position, affiliation"),
+    ("keywords", "Keywords"),
+)
+
+
+@dataclass(slots=True)
+class ProfileRu:
+    """Русская часть профиля."""
+
+    name_line: str = ""  # ФИО, звание и место работы
+    specialization: str = ""
+    website: str = ""
+    email: str = ""
+    spin: str = ""
+    scopus: str = ""
+    researcher: str = ""
+    orcid: str = ""
+
+    def to_dict(self) -> Dict[str, str]:
+        return {label: getattr(self, attr) for attr, label in RU_LABELS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "ProfileRu":
+        return cls(*(data.get(label, "") for _, label in RU_LABELS))
+
+
+@dataclass(slots=True)
+class ProfileEn:
+    """Английская часть профиля."""
+
+    name_line: str = ""  # Name, position, affiliation
+    keywords: str = ""
+
+    def to_dict(self) -> Dict[str, str]:
+        return {label: getattr(self, attr) for attr, label in EN_LABELS}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, str]) -> "ProfileEn":
+        return cls(*(data.get(label, "") for _, label in EN_LABELS))
+
+
+@dataclass(slots=True)
+class Profile:
+    """Профиль: русская и английская части."""
+
+    ru: ProfileRu
+    en: ProfileEn
+
+    def to_dict(self) -> Dict[str, Dict[str, str]]:
+        """Прежний формат {"ru": {...}, "en": {...}}."""
+        return {"ru": self.ru.to_dict(), "en": self.en.to_dict()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, str]]) -> "Profile":
+        return cls(ProfileRu.from_dict(data.get("ru", {})), ProfileEn.from_dict(data.get("en", {})))
@@ -0,0 +1,207 @@
+"""
+Кэш результатов парсинга docx по содержимому файла.
+
+Между воркерами gunicorn (и процессами uvicorn) кэш общий, только если
+задан каталог PARSE_CACHE_DIR: без него у каждого процесса свой кэш в
+памяти, и файл, разобранный одним воркером, другой разберет заново.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from editor_parser import PARSER_VERSION, ExecutorFactory, collect_results, iter_parse_many
+from models import Profile
+
+Profiles = List[Profile]
+
+
+class ParseCache:
+    """
+    Двухуровневый кэш профилей, разобранных из docx.
+
+    Ключ - SHA-256 от версии парсера и байтов файла, поэтому неизмененный
+    файл не разбирается повторно, а смена PARSER_VERSION сбрасывает кэш.
+    Первый уровень - LRU в памяти процесса, второй (необязательный) -
+    каталог JSON файлов, общий для всех воркеров gunicorn. Файлы на диске,
+    к которым не обращались дольше ttl секунд, удаляются (как в
+    ArtifactStore.expire); проверка идет не чаще раза в EXPIRE_INTERVAL.
+    """
+
+    # Как часто (в секундах) при записи проверяются устаревшие файлы на диске
+    EXPIRE_INTERVAL = 300
+
+    def __init__(self, max_entries: int = 1024, directory: Optional[Path] = None,
+                 ttl: int = 7 * 86400):
+        """
+        Args:
+            max_entries: Максимум файлов в памяти (0 - не кэшировать в памяти)
+            directory: Каталог для хранения на диске (None - только память)
+            ttl: Время хранения файла на диске после последнего обращения, в секундах
+        """
+        self.max_entries = max_entries
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self._next_expire = 0.0
+        self.hits = 0
+        self.misses = 0
+        self._memory: "OrderedDict[str, Profiles]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(blob: bytes) -> str:
+        """Ключ кэша для содержимого docx файла."""
+        digest = hashlib.sha256(PARSER_VERSION.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(blob)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Profiles]:
+        """Профили по ключу или None, если файла нет в кэше."""
+        with self._lock:
+            profiles = self._memory.get(key)
+            if profiles is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return profiles
+
+        profiles = self._load(key)
+        with self._lock:
+            if profiles is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, profiles)
+        return profiles
+
+    def put(self, key: str, profiles: Profiles) -> None:
+        """Сохраняет профили в памяти и на диске."""
+        with self._lock:
+            self._remember(key, profiles)
+        self._store(key, profiles)
+
+    def iter_parse_many(self, blobs: Iterable[bytes], workers: Optional[int] = None,
+                        backend: Optional[str] = None,
+                        executor: Optional[ExecutorFactory] = None) -> Iterator[Tuple[Profiles, Optional[str]]]:
+        """
+        То же, что editor_parser.iter_parse_many, но файлы из кэша не разбираются.
+        Файлы с ошибками не кэшируются. blobs читаются по мере разбора
+        (может быть генератором), как и в editor_parser.iter_parse_many.
+        """
+        # Очередь результатов в порядке входа: профили из кэша или ключ
+        # файла, отправленного на разбор (его результат придет из parsed)
+        order: "deque[Tuple[Optional[str], Optional[Profiles]]]" = deque()
+
+        def missing() -> Iterator[bytes]:
+            for blob in blobs:
+                key = self.key(blob)
+                profiles = self.get(key)
+                order.append((key, profiles))
+                if profiles is None:
+                    yield blob
+
+        parsed = iter_parse_many(missing(), workers=workers, backend=backend, executor=executor)
+        ready = None
+        while True:
+            if not order:
+                # Следующий результат разбора; по пути missing() добавит в
+                # order все предшествующие ему файлы из кэша
+                ready = next(parsed, None)
+                if not order:
+                    return
+            key, profiles = order.popleft()
+            if profiles is not None:
+                yield profiles, None
+                continue
+            if ready is None:
+                ready = next(parsed)
+            profiles, error = ready
+            ready = None
+            if not error:
+                self.put(key, profiles)
+            yield profiles, error
+
+    def parse_many(self, blobs: List[bytes], workers: Optional[int] = None,
+                   backend: Optional[str] = None,
+                   progress: Optional[Callable[[int, int], None]] = None) -> List[Tuple[Profiles, Optional[str]]]:
+        """То же, что editor_parser.parse_many, но с кэшем (см. iter_parse_many)."""
+        return collect_results(self.iter_parse_many(blobs, workers=workers, backend=backend), len(blobs), progress)
+
+    def stats(self) -> Dict[str, int]:
+        """Счетчики попаданий и промахов."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "entries": len(self._memory),
+                "max_entries": self.max_entries,
+            }
+
+    def clear(self) -> None:
+        """Очищает уровень в памяти и сбрасывает счетчики (диск не трогает)."""
+        with self._lock:
+            self._memory.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _remember(self, key: str, profiles: Profiles) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = profiles
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def expire(self) -> None:
+        """Удаляет с диска файлы кэша (и брошенные временные файлы) старше ttl."""
+        if not self.directory:
+            return
+        deadline = time.time() - self.ttl
+        for path in self.directory.iterdir():
+            try:
+                if path.stat().st_mtime < deadline:
+                    path.unlink()
+            except OSError:
+                continue
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _load(self, key: str) -> Optional[Profiles]:
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                profiles = [Profile.from_dict(profile) for profile in json.load(f)]
+            # Обращение продлевает срок хранения
+            os.utime(path)
+            return profiles
+        except (OSError, ValueError, AttributeError, TypeError):
+            return None
+
+    def _store(self, key: str, profiles: Profiles) -> None:
+        if not self.directory:
+            return
+        now = time.time()
+        if now >= self._next_expire:
+            self._next_expire = now + self.EXPIRE_INTERVAL
+            self.expire()
+        # Пишем во временный файл и переименовываем, чтобы другой воркер
+        # не прочитал наполовину записанный JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump([profile.to_dict() for profile in profiles], f, ensure_ascii=False)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Не удалось сохранить кэш {key}: {e}")
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
@@ -0,0 +1,108 @@
+"""
+HTML-представление профилей редакционной коллегии.
+Общий модуль для веб-приложения (app.py) и консольного режима (main.py).
+"""
+from html import escape
+from typing import Callable, Iterable, List, Tuple
+
+from models import Profile, ProfileEn, ProfileRu
+
+
+# Строка с ФИО: ФИО жирным, остальное обычным
+def _name_with_rest(fio: str, rest: str) -> str:
+    return f'<p style="padding-left: 40px;"><strong>{fio}</strong>, {rest}</p>'
+
+
+def _name_only(fio: str) -> str:
+    return f'<p style="padding-left: 40px;"><strong>{fio}</strong></p>'
+
+
+# Шаблоны полей русской части профиля в порядке вывода: (атрибут ProfileRu, шаблон).
+# Шаблон получает значение поля, уже экранированное один раз
+RU_FIELD_TEMPLATES: Tuple[Tuple[str, Callable[[str], str]], ...] = (
+    ("specialization", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>Специализация:&nbsp;</strong>{v}</p>'
+    )),
+    ("website", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>Адрес личной страницы в интернете URL: </strong>'
+        f'<a href="{v}" target="_blank" rel="noopener">{v}</a></p>'
+    )),
+    ("email", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>E-mail:</strong> '
+        f'<a href="mailto:{v}" target="_blank" rel="noopener">{v}</a></p>'
+    )),
+    ("spin", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>eLibrary SPIN-код: </strong>{v}</p>'
+    )),
+    ("scopus", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>SCOPUS Author ID: </strong>'
+        f'<a href="https://www.scopus.com/authid/detail.uri?authorId={v}" target="_blank" rel="noopener">{v}</a></p>'
+    )),
+    ("researcher", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>Researcher ID: </strong>'
+        f'<a href="https://publons.com/researcher/{v}" target="_blank" rel="noopener">{v}</a></p>'
+    )),
+    ("orcid", lambda v: (
+        f'<p style="padding-left: 80px;"><strong>ORCID: </strong>'
+        f'<a href="https://orcid.org/{v}" target="_blank" rel="noopener">{v}</a></p>'
+    )),
+)
+
+
+def _keywords(keywords: str) -> str:
+    return f'<p style="padding-left: 80px;"><strong>Keywords:&nbsp;</strong>{keywords}</p>'
+
+
+def _name_line(line: str) -> str:
+    parts = line.split(",", 1)
+    if len(parts) == 2:
+        return _name_with_rest(escape(parts[0].strip()), escape(parts[1].strip()))
+    return _name_only(escape(line))
+
+
+def make_profile_html(profile: ProfileRu) -> str:
+    """Создает HTML блок для русской части профиля."""
+    html_block = [_name_line(profile.name_line)]
+    for attr, template in RU_FIELD_TEMPLATES:
+        value = getattr(profile, attr)
+        # Пустые поля и прочерк "-" не выводятся
+        if value:
+            stripped = value.strip()
+            if stripped and stripped != "-":
+                html_block.append(template(escape(value)))
+    return "\n".join(html_block)
+
+
+def make_english_html(profile: ProfileEn) -> str:
+    """Создает HTML блок для английской части профиля (пустой, если нет имени)."""
+    line = profile.name_line
+    if not line:
+        return ""
+    if profile.keywords:
+        return _name_line(line) + _keywords(escape(profile.keywords))
+    return _name_line(line)
+
+
+def render_profiles(profiles: Iterable[Profile]) -> Tuple[str, str]:
+    """
+    Создает HTML всех профилей одним проходом.
+    Профили разделяются тегом <br>.
+
+    Returns:
+        Tuple[str, str]: (html_ru, html_en)
+    """
+    html_ru = []
+    html_en = []
+    for profile in profiles:
+        html_ru.append(make_profile_html(profile.ru))
+        html_en.append(make_english_html(profile.en))
+    return '<br>'.join(html_ru).strip(), '<br>'.join(html_en).strip()
+
+
+def english_lines(profiles: Iterable[Profile]) -> List[str]:
+    """Строки "Name, position, affiliation" для текстового списка на английском."""
+    return [
+        profile.en.name_line
+        for profile in profiles
+        if profile.en.name_line
+    ]
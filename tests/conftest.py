@@ -0,0 +1,5 @@
+"""Модули приложения лежат в корне репозитория: тесты импортируют их оттуда."""
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
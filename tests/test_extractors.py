@@ -0,0 +1,176 @@
+"""
+Способы чтения таблиц "docx" (python-docx) и "lxml" должны давать одинаковые
+data и data_en на сложной разметке: объединенные ячейки, смещенные строки,
+гиперссылки, переносы и вложенные таблицы.
+"""
+import io
+import zipfile
+
+import pytest
+
+from editor_parser import TABLE_EXTRACTORS
+
+W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+R_NS = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+
+CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+DOCUMENT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId9" Target="https://example.org/" TargetMode="External" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/hyperlink"/>'
+    '</Relationships>'
+)
+
+
+def run(text: str = "", extra: str = "") -> str:
+    """w:r с текстом; extra - элементы после текста (w:br, w:tab, ...)."""
+    body = f'<w:t xml:space="preserve">{text}</w:t>' if text else ""
+    return f"<w:r>{body}{extra}</w:r>"
+
+
+def cell(*paragraphs: str, props: str = "") -> str:
+    """w:tc из абзацев (каждый - уже собранное содержимое w:p) или вложенных таблиц."""
+    content = "".join(p if p.startswith("<w:tbl>") else f"<w:p>{p}</w:p>" for p in paragraphs)
+    return f"<w:tc><w:tcPr>{props}</w:tcPr>{content or '<w:p/>'}</w:tc>"
+
+
+def text_cell(text: str, props: str = "") -> str:
+    return cell(run(text), props=props)
+
+
+def row(*cells: str, grid_before: int = 0) -> str:
+    props = f'<w:trPr><w:gridBefore w:val="{grid_before}"/></w:trPr>' if grid_before else ""
+    return f"<w:tr>{props}{''.join(cells)}</w:tr>"
+
+
+def table(*rows: str, columns: int = 3) -> str:
+    grid = "".join('<w:gridCol w:w="2000"/>' for _ in range(columns))
+    return f"<w:tbl><w:tblPr/><w:tblGrid>{grid}</w:tblGrid>{''.join(rows)}</w:tbl>"
+
+
+def make_docx(*tables: str) -> bytes:
+    body = "<w:p/>".join(tables)
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{W_NS}" xmlns:r="{R_NS}"><w:body>{body}<w:p/></w:body></w:document>'
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as package:
+        package.writestr("[Content_Types].xml", CONTENT_TYPES)
+        package.writestr("_rels/.rels", ROOT_RELS)
+        package.writestr("word/_rels/document.xml.rels", DOCUMENT_RELS)
+        package.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+SPAN_2 = '<w:gridSpan w:val="2"/>'
+MERGE_START = '<w:vMerge w:val="restart"/>'
+MERGE_CONTINUE = "<w:vMerge/>"
+
+# Анкета со всеми особенностями разметки, которые различают способы чтения
+QUESTIONNAIRE = table(
+    row(text_cell("Поле"), text_cell("На русском"), text_cell("In English")),
+    row(text_cell("ФИО"), text_cell("Иванов Иван Иванович"), text_cell("Ivanov Ivan")),
+    # Подпись на две колонки: значение ru совпадает с подписью
+    row(text_cell("Должность в редакции", props=SPAN_2), text_cell("Member")),
+    # Вертикальное объединение: строки ниже получают значение из корневой ячейки
+    row(text_cell("Ученая степень"), text_cell("д.т.н.", props=MERGE_START), text_cell("DSc")),
+    row(text_cell("Ученое звание"), cell(props=MERGE_CONTINUE), text_cell("Professor")),
+    row(text_cell("Степень"), cell(props=MERGE_CONTINUE), text_cell("")),
+    # Объединение на две колонки, продолжающееся вниз
+    row(text_cell("Основное место работы"), text_cell("МГУ", props=SPAN_2 + MERGE_START)),
+    row(text_cell("Подразделение организации"), cell(props=SPAN_2 + MERGE_CONTINUE)),
+    # Строка, начинающаяся со второй колонки (ячейки сдвигаются влево),
+    # и продолжение ее объединения в следующей строке
+    row(text_cell("сдвинутая строка", props=MERGE_START), text_cell("shifted"), grid_before=1),
+    row(text_cell("Отчество"), cell(props=MERGE_CONTINUE), text_cell("")),
+    # Гиперссылка и несколько абзацев
+    row(
+        text_cell("Адрес личной страницы (URL)"),
+        cell(
+            run("Сайт: ") + f'<w:hyperlink r:id="rId9">{run("https://example.org")}</w:hyperlink>',
+            run("второй абзац"),
+        ),
+        cell(f'<w:hyperlink w:anchor="top">{run("anchor")}{run(" link")}</w:hyperlink>'),
+    ),
+    # Переносы, табуляция и неразрывный дефис
+    row(
+        text_cell("Ключевые слова"),
+        cell(
+            run("один", "<w:br/>")
+            + run("два", '<w:br w:type="page"/>')
+            + run("три", '<w:br w:type="column"/>')
+            + run("четыре", "<w:cr/>")
+            + run("пять", "<w:tab/>")
+            + run("шесть", "<w:noBreakHyphen/>")
+            + run("семь", "<w:ptab/>")
+        ),
+        cell(run("one", "<w:br/>") + run("two")),
+    ),
+    # Вложенная таблица: в текст ячейки не входит и отдельной таблицей не считается
+    row(
+        text_cell("ORCID"),
+        cell(
+            run("0000-0002-1825-0097"),
+            table(row(text_cell("ФИО"), text_cell("Вложенный"), text_cell("Nested")), columns=3),
+        ),
+        text_cell("0000-0002-1825-0097"),
+    ),
+    row(text_cell("Email"), text_cell("ivanov@example.org"), text_cell("ivanov@example.org")),
+)
+
+# Таблица, которая не похожа на анкету (отбрасывается при classify)
+OTHER = table(
+    row(text_cell("Номер"), text_cell("Дата"), text_cell("Сумма")),
+    row(text_cell("1", props=SPAN_2), text_cell("100")),
+)
+
+
+def extract(backend: str, blob: bytes, classify: bool):
+    return [
+        (data, data_en)
+        for _, data, data_en in TABLE_EXTRACTORS[backend](io.BytesIO(blob), classify=classify)
+    ]
+
+
+@pytest.mark.parametrize("classify", [False, True])
+def test_backends_match(classify):
+    blob = make_docx(QUESTIONNAIRE, OTHER, QUESTIONNAIRE)
+    docx_tables = extract("docx", blob, classify)
+    lxml_tables = extract("lxml", blob, classify)
+
+    assert len(docx_tables) == (2 if classify else 3)
+    assert lxml_tables == docx_tables
+
+
+def test_markup_is_read():
+    (data, data_en), = extract("lxml", make_docx(QUESTIONNAIRE), classify=True)
+
+    assert data["Должность в редакции"] == "Должность в редакции"
+    assert data_en["Должность в редакции"] == "Member"
+    assert data["Ученое звание"] == data["Степень"] == "д.т.н."
+    assert data_en["Подразделение организации"] == "МГУ"
+    assert data["сдвинутая строка"] == "shifted"
+    assert data["Отчество"] == "сдвинутая строка"
+    assert data["Адрес личной страницы (URL)"] == "Сайт: https://example.org\nвторой абзац"
+    assert data_en["Адрес личной страницы (URL)"] == "anchor link"
+    assert data["Ключевые слова"] == "один\nдватричетыре\nпять\tшесть-семь"
+    assert data["ORCID"] == "0000-0002-1825-0097"
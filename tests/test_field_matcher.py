@@ -0,0 +1,83 @@
+"""
+FieldMatcher должен выбирать те же значения, что и прежняя функция get()
+из parse_table_to_profile: первая по порядку строк подпись, содержащая
+любой синоним поля, с заполненным значением.
+"""
+import random
+import re
+
+import pytest
+
+from editor_parser import EN_FIELDS, RU_FIELDS
+
+
+def reference_get(possible_keys, source):
+    """Прежняя get() из parse_table_to_profile, без изменений."""
+    def normalize(text: str) -> str:
+        return re.sub(r"[^a-zа-я0-9]", "", text.lower())
+
+    def is_valid_field(value: str) -> bool:
+        lowered = value.lower()
+        return (
+            value.strip()
+            and value.strip() != "-"
+            and "найти" not in lowered
+            and "важно" not in lowered
+            and "профиль" not in lowered
+        )
+
+    for key in source:
+        nk = normalize(key)
+        for target in possible_keys:
+            if normalize(target) in nk:
+                val = source[key].strip()
+                if is_valid_field(val):
+                    return val
+    return ""
+
+
+def reference_values(matcher, source):
+    return {name: reference_get(synonyms, source) for name, synonyms in matcher.fields.items()}
+
+
+MATCHERS = {"ru": RU_FIELDS, "en": EN_FIELDS}
+
+CASES = [
+    {},
+    # Незаполненные и служебные значения пропускаются, берется следующая строка
+    {"ФИО": "-", "Фамилия Имя Отчество": " Иванов Иван "},
+    {"ФИО": "Найти в профиле", "Фамилия": "Петров", "Имя": "Петр", "Отчество": ""},
+    {"Ученая степень": "ВАЖНО: заполнить", "Ученое звание": "доцент", "Степень": "к.т.н."},
+    # Одна подпись подходит нескольким полям
+    {"Фамилия Имя Отчество": "Сидоров", "Ученая степень, ученое звание": "д.ф.-м.н., профессор"},
+    {"Ключевые слова (keywords)": "физика", "Специализация": "оптика"},
+    # Порядок строк важнее порядка синонимов
+    {"Scopus": "1", "Scopus Author ID": "2", "Scopus ID": "3"},
+    {"Сайт": "a.org", "Адрес личной страницы (URL)": "b.org"},
+    {"E-mail": "x@y.z", "Адрес электронной почты": "y@y.z"},
+    {"Researcher ID": "A-1234-2008", "ORCID": "0000-0002-1825-0097", "SPIN-код": "1234-5678"},
+    {"Должность в редакции": "", "Членство в редколлегии": "член", "Позиция": "редактор"},
+    {"Основное место работы": "МГУ", "Подразделение организации": "физфак", "Область интересов": "  "},
+]
+
+
+@pytest.mark.parametrize("language", MATCHERS)
+@pytest.mark.parametrize("source", CASES)
+def test_matches_reference(language, source):
+    matcher = MATCHERS[language]
+    assert matcher.values(source) == reference_values(matcher, source)
+
+
+@pytest.mark.parametrize("language", MATCHERS)
+def test_matches_reference_random(language):
+    matcher = MATCHERS[language]
+    labels = [synonym for synonyms in matcher.fields.values() for synonym in synonyms]
+    labels += ["Поле", "Примечание", "Телефон", "Ученая степень, звание", "Scopus Author ID / ORCID"]
+    values = ["значение", " текст ", "", "  ", "-", "Найти", "важно", "Профиль", "0000-0001"]
+    rng = random.Random(0)
+    for _ in range(2000):
+        source = {}
+        for label in rng.sample(labels, rng.randint(0, 12)):
+            key = rng.choice([label, label.upper(), f"{label}:", f"Укажите {label.lower()}"])
+            source[key] = rng.choice(values) + rng.choice(["", str(rng.randint(0, 9))])
+        assert matcher.values(source) == reference_values(matcher, source), source
@@ -0,0 +1,129 @@
+"""
+Чтение загруженных файлов, общее для app.py (Flask) и asgi.py (Starlette):
+docx файлы zip-архива и части запроса /api/parse.
+"""
+import zipfile
+from contextlib import ExitStack
+from itertools import chain
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from identifiers import check_identifiers
+from metrics import METRICS
+from models import Profile
+
+Entry = Dict[str, Any]
+
+
+def docx_members(zip_ref: zipfile.ZipFile) -> List[zipfile.ZipInfo]:
+    """
+    docx файлы архива (включая вложенные папки), без чтения содержимого.
+    Остальные файлы архива (сканы, pdf и т.п.) пропускаются. Счетчик
+    архивов jobs увеличивает вызывающий код, когда архив принят в разбор.
+
+    Raises:
+        ValueError: если в архиве нет ни одного docx файла
+    """
+    members = [
+        info for info in zip_ref.infolist()
+        if not info.is_dir() and info.filename.endswith('.docx')
+    ]
+    if not members:
+        raise ValueError("В архиве не найдено файлов .docx")
+    return members
+
+
+def iter_member_blobs(zip_ref: zipfile.ZipFile, members: Iterable[zipfile.ZipInfo]) -> Iterator[bytes]:
+    """
+    Содержимое docx файлов архива по одному, по мере того как разбор
+    запрашивает следующий файл (см. editor_parser.iter_parse_many):
+    в памяти только файлы, которые сейчас разбираются.
+    """
+    for info in members:
+        with METRICS.stage("unzip"):
+            blob = zip_ref.read(info)
+        yield blob
+
+
+def _accepted_archive(zip_ref: zipfile.ZipFile, members: List[zipfile.ZipInfo]) -> Iterator[bytes]:
+    """iter_member_blobs, учитывающий архив в счетчике jobs, когда разбор до него дошел."""
+    METRICS.count("jobs")
+    yield from iter_member_blobs(zip_ref, members)
+
+
+def collect_parts(parts: Iterable[Tuple[str, BinaryIO]],
+                  archives: ExitStack) -> Tuple[List[Entry], List[Entry], Iterator[bytes]]:
+    """
+    Части запроса /api/parse: .docx - один файл, .zip - все docx файлы архива.
+    Архивы открываются в archives и должны оставаться открытыми, пока
+    читается sources. Некорректная часть получает запись с ошибкой и не
+    прерывает обработку остальных.
+
+    Args:
+        parts: (имя файла, файловый объект) в порядке частей запроса
+
+    Returns:
+        (записи ответа в порядке частей, записи файлов для разбора,
+        содержимое этих файлов в том же порядке - читается лениво)
+    """
+    entries: List[Entry] = []
+    pending: List[Entry] = []
+    sources: List[Iterable[bytes]] = []
+    for filename, stream in parts:
+        filename = filename or ''
+        if filename.lower().endswith('.docx'):
+            entry = {'file': filename}
+            entries.append(entry)
+            pending.append(entry)
+            sources.append(part.read() for part in (stream,))
+            continue
+
+        if not filename.lower().endswith('.zip'):
+            entries.append({'file': filename, 'profiles': [], 'error': 'Поддерживаются только файлы .zip и .docx'})
+            continue
+
+        try:
+            zip_ref = archives.enter_context(zipfile.ZipFile(stream, 'r'))
+            members = docx_members(zip_ref)
+        except zipfile.BadZipFile:
+            entries.append({'file': filename, 'profiles': [], 'error': 'Некорректный zip-архив'})
+            continue
+        except ValueError as e:
+            entries.append({'file': filename, 'profiles': [], 'error': str(e)})
+            continue
+        for info in members:
+            entry = {'file': f'{filename}/{info.filename}'}
+            entries.append(entry)
+            pending.append(entry)
+        sources.append(_accepted_archive(zip_ref, members))
+    return entries, pending, chain.from_iterable(sources)
+
+
+def api_result(entries: List[Entry], parsed: List[Tuple[Entry, List[Profile], Optional[str]]],
+               normalize_ids: bool = False) -> Dict[str, Any]:
+    """
+    Ответ /api/parse: профили и ошибка в записи каждого разобранного файла;
+    при normalize_ids идентификаторы всех профилей нормализуются одним
+    пакетом, а в записи добавляются флаги проверки (identifier_flags).
+    """
+    flags = None
+    if normalize_ids:
+        with METRICS.stage("identifiers"):
+            all_profiles, flags = check_identifiers(
+                profile for _, profiles, _ in parsed for profile in profiles
+            )
+        flags = flags.to_dict('records')
+
+    start = 0
+    for entry, profiles, error in parsed:
+        end = start + len(profiles)
+        if flags is not None:
+            profiles = all_profiles[start:end]
+            entry['identifier_flags'] = flags[start:end]
+        entry['profiles'] = [profile.to_dict() for profile in profiles]
+        entry['error'] = error
+        start = end
+
+    return {
+        'files': entries,
+        'profiles_count': sum(len(entry['profiles']) for entry in entries),
+    }
@@ -0,0 +1,113 @@
+"""
+Прогрев процесса перед обработкой запросов.
+
+Разбирает встроенную крошечную анкету (docx собирается в памяти), чтобы
+импортировать python-docx, lxml и pandas, скомпилировать регулярные
+выражения и создать кэши этих библиотек заранее. В gunicorn с --preload
+это делается один раз в главном процессе (см. gunicorn.conf.py), и
+воркеры получают готовое состояние при fork через copy-on-write.
+"""
+import io
+import time
+import zipfile
+from html import escape
+from typing import Iterable, List, Optional, Tuple
+
+from editor_parser import TABLE_EXTRACTORS, parse_profiles_from_docx
+from models import Profile
+
+# Строки анкеты: (подпись, значение ru, значение en)
+WARMUP_ROWS: List[Tuple[str, str, str]] = [
+    ("Фамилия Имя Отчество", "Иванов Иван Иванович", "Ivanov Ivan"),
+    ("Должность в редакции", "Член редколлегии", "Editorial Board Member"),
+    ("Ученая степень, ученое звание", "доктор наук, профессор", "DSc, Professor"),
+    ("Основное место работы", "Университет", "University"),
+    ("Специализация, ключевые слова", "механика", "mechanics"),
+    ("Адрес личной страницы в интернете URL", "https://example.org", ""),
+    ("Адрес электронной почты", "ivanov@example.org", ""),
+    ("SPIN-код в eLibrary", "1234-5678", ""),
+    ("Scopus Author ID", "57190000000", ""),
+    ("Researcher ID", "A-1234-2010", ""),
+    ("ORCID", "0000-0002-1825-0097", ""),
+]
+
+# Таблица подписей: отбрасывается классификатором таблиц
+WARMUP_LAYOUT_ROWS: List[Tuple[str, str, str]] = [
+    ("Подпись", "", ""),
+    ("Дата заполнения", "", ""),
+]
+
+_W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType='
+    '"application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Target="word/document.xml" Type='
+    '"http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"/>'
+    '</Relationships>'
+)
+
+
+def _table_xml(rows: Iterable[Tuple[str, ...]]) -> str:
+    cells = "".join(
+        "<w:tr>" + "".join(f"<w:tc><w:p><w:r><w:t>{escape(text)}</w:t></w:r></w:p></w:tc>" for text in row) + "</w:tr>"
+        for row in rows
+    )
+    return f"<w:tbl>{cells}</w:tbl><w:p/>"
+
+
+def make_warmup_docx() -> bytes:
+    """Минимальный docx с одной анкетой и одной таблицей подписей."""
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:document xmlns:w="{_W_NS}"><w:body>'
+        f"{_table_xml(WARMUP_ROWS)}{_table_xml(WARMUP_LAYOUT_ROWS)}"
+        "</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as package:
+        package.writestr("[Content_Types].xml", _CONTENT_TYPES)
+        package.writestr("_rels/.rels", _RELS)
+        package.writestr("word/document.xml", document)
+    return buffer.getvalue()
+
+
+def warm_up(backends: Optional[Iterable[str]] = None) -> List[Profile]:
+    """
+    Разбирает встроенную анкету каждым способом извлечения таблиц,
+    строит HTML и проверяет идентификаторы (см. identifiers.py).
+
+    Args:
+        backends: Способы извлечения таблиц (по умолчанию все)
+
+    Returns:
+        Профили, разобранные последним способом
+
+    Raises:
+        RuntimeError: если анкета не разобралась (сломана среда или парсер)
+    """
+    # Импорт здесь: pandas нужен только для прогрева, а не для разбора
+    from identifiers import check_identifiers
+    from renderer import render_profiles
+
+    started = time.perf_counter()
+    blob = make_warmup_docx()
+    profiles: List[Profile] = []
+    for backend in backends or TABLE_EXTRACTORS:
+        profiles = parse_profiles_from_docx(io.BytesIO(blob), backend=backend)
+        if len(profiles) != 1:
+            raise RuntimeError(f"Прогрев: анкета не разобрана ({backend})")
+    render_profiles(profiles)
+    check_identifiers(profiles)
+    print(f"Прогрев завершен за {time.perf_counter() - started:.3f} с")
+    return profiles
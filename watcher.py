@@ -0,0 +1,108 @@
+"""
+Отслеживание изменений в папке с анкетами для main.py --watch.
+
+Если установлен watchdog (pip install watchdog), используются события
+файловой системы (inotify в Linux), иначе папка опрашивается по таймеру.
+"""
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # watchdog не установлен - опрашиваем папку
+    Observer = None
+
+# События watchdog, означающие изменение содержимого папки
+CHANGE_EVENTS = ("created", "modified", "deleted", "moved", "closed")
+
+
+def snapshot(directory: Path, pattern: str = "*.docx") -> Dict[str, Tuple[float, int]]:
+    """Состояние папки: имя файла -> (mtime, размер)."""
+    state = {}
+    for path in directory.glob(pattern):
+        try:
+            stat = path.stat()
+        except OSError:
+            # Файл удалили между glob и stat
+            continue
+        state[path.name] = (stat.st_mtime, stat.st_size)
+    return state
+
+
+def _start_observer(directory: Path, changed: threading.Event):
+    """Запускает watchdog, взводящий changed при изменении docx файлов."""
+
+    class Handler(FileSystemEventHandler):
+        def on_any_event(self, event):
+            # Открытие и чтение файлов (в том числе самой пересборкой) не считается изменением
+            if event.event_type not in CHANGE_EVENTS:
+                return
+            paths = (event.src_path, getattr(event, "dest_path", ""))
+            if any(str(path).endswith(".docx") for path in paths):
+                changed.set()
+
+    observer = Observer()
+    observer.schedule(Handler(), str(directory), recursive=False)
+    observer.start()
+    return observer
+
+
+def watch(directory: Path, rebuild: Callable[[], None], debounce: float = 1.0,
+          interval: float = 1.0, stop: Optional[threading.Event] = None) -> None:
+    """
+    Вызывает rebuild() после каждого изменения docx файлов в directory.
+
+    Серия изменений (копирование папки, сохранение из Word) объединяется:
+    rebuild() вызывается, когда в течение debounce секунд ничего не менялось.
+    Ошибка в rebuild() выводится и не останавливает наблюдение.
+
+    Args:
+        directory: Папка с анкетами
+        rebuild: Пересборка результатов
+        debounce: Сколько секунд папка должна оставаться без изменений
+        interval: Период опроса, если watchdog не установлен
+        stop: Событие для остановки (по умолчанию - до Ctrl+C)
+    """
+    directory = Path(directory)
+    stop = stop or threading.Event()
+    changed = threading.Event()
+    observer = _start_observer(directory, changed) if Observer else None
+    if observer is None:
+        print(f"watchdog не установлен, папка опрашивается каждые {interval} с")
+
+    state = snapshot(directory)
+    try:
+        while not stop.is_set():
+            if observer is not None:
+                if not changed.wait(interval):
+                    continue
+            else:
+                if stop.wait(interval):
+                    break
+                if snapshot(directory) == state:
+                    continue
+
+            # Ждем, пока изменения не прекратятся
+            pending = snapshot(directory)
+            while True:
+                changed.clear()
+                if stop.wait(debounce):
+                    return
+                current = snapshot(directory)
+                if current == pending and not changed.is_set():
+                    break
+                pending = current
+            state = pending
+
+            try:
+                rebuild()
+            except Exception as e:
+                print(f"Ошибка при пересборке: {e}")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if observer is not None:
+            observer.stop()
+            observer.join()